@@ -0,0 +1,77 @@
+"""
+Response caching for analytics endpoints.
+
+Cached payloads are stored together with the global data version they were
+computed at. The signal handlers in signals.py bump that version on every
+Transaction, Category or User write, so stale entries are never served and
+never need to be found and deleted.
+
+This relies on the default cache being shared by all worker processes (see
+CACHES in settings); with a per-process cache, a bump would only reach the
+worker that handled the write.
+"""
+
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.response import Response
+
+VERSION_KEY = 'analytics:version'
+
+# Upper bound for an entry's lifetime; writes invalidate it sooner
+CACHE_TIMEOUT = 300
+
+
+def get_version() -> int:
+    """Current data version, seeded with a timestamp so it never repeats."""
+    return cache.get_or_set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_version() -> None:
+    """Invalidate every cached analytics response."""
+    # A fresh value rather than incr(), which the database cache implements
+    # as a read-modify-write that concurrent bumps could collapse
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def cached_response(get):
+    """
+    Cache a view's successful response data.
+    
+    The key covers the view (module-qualified, as apps reuse view names),
+    today's date (the views are relative to "now") and a hash of the query
+    params, which keeps client input from setting the key's length. The data
+    version is stored with the entry instead, so a hit fetches the version
+    and the entry in one get_many().
+    """
+    @wraps(get)
+    def wrapper(self, request, *args, **kwargs):
+        params = hashlib.md5(
+            urlencode(sorted(request.query_params.items())).encode()
+        ).hexdigest()
+        key = (
+            f"analytics:{type(self).__module__}.{type(self).__name__}:"
+            f"{timezone.localdate()}:{params}"
+        )
+        
+        cached = cache.get_many([VERSION_KEY, key])
+        version = cached.get(VERSION_KEY)
+        if version is None:
+            version = get_version()
+        
+        entry = cached.get(key)
+        if entry is not None and entry[0] == version:
+            return Response(entry[1])
+        
+        response = get(self, request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        cache.set(key, (version, response.data), CACHE_TIMEOUT)
+        
+        return Response(response.data)
+    
+    return wrapper
@@ -0,0 +1,32 @@
+"""
+JSON renderer for analytics endpoints backed by orjson.
+"""
+
+from decimal import Decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+def _default(obj):
+    # Match DRF's encoder, which renders Decimal as a JSON number
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Render response data with orjson's C encoder instead of the json module.
+    
+    Dates, datetimes and NumPy scalars are handled natively.
+    """
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY
+        )
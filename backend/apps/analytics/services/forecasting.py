@@ -1,5 +1,5 @@
 """
-ML-Powered Budget Forecasting Service using scikit-learn.
+ML-Powered Budget Forecasting Service using NumPy.
 
 This service provides:
 1. Spending trend analysis
@@ -8,36 +8,97 @@ This service provides:
 4. Category-wise spending forecasts
 """
 
+import hashlib
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 import numpy as np
-import pandas as pd
-from sklearn.linear_model import LinearRegression, Ridge
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest
-from django.db.models import Sum, Count, Avg
-from django.db.models.functions import TruncMonth, TruncWeek, TruncDate
+from django.core.cache import cache
+from django.db.models import Sum, Count, Avg, Q
+from django.db.models.functions import TruncWeek, TruncDate
 from django.utils import timezone
 
+from apps.transactions.models import MonthlySummary, Transaction
+
+from ..cache import get_version
+from ..utils import add_months
+
 logger = logging.getLogger(__name__)
 
 
+def _fit_linear_1d(x: np.ndarray, y: np.ndarray, alpha: float = 0.0):
+    """
+    Fit y = slope * x + intercept for a single feature.
+    
+    Closed-form equivalent of sklearn's Ridge (alpha > 0) or LinearRegression
+    (alpha == 0) with an unpenalized intercept.
+    """
+    x_mean = x.mean()
+    y_mean = y.mean()
+    x_centered = x - x_mean
+    slope = float((x_centered * (y - y_mean)).sum() / ((x_centered ** 2).sum() + alpha))
+    intercept = float(y_mean - slope * x_mean)
+    return slope, intercept
+
+
+def _mad_outliers(amounts: np.ndarray, threshold: float = 3.5) -> np.ndarray:
+    """
+    Return indices of unusually high values using the modified z-score.
+    
+    Uses 0.6745 * (x - median) / MAD (Iglewicz & Hoaglin), which stays robust
+    to the very outliers it is looking for. Pure NumPy, so it can be applied
+    per user in batch jobs as well as per request.
+    
+    When more than half the amounts are identical the MAD is 0, so the score
+    falls back to the mean absolute deviation, (x - median) / (1.253314 *
+    MeanAD). If every amount is the same there is nothing to flag.
+    """
+    median = np.median(amounts)
+    deviations = amounts - median
+    mad = np.median(np.abs(deviations))
+    if mad:
+        z_scores = 0.6745 * deviations / mad
+    else:
+        mean_ad = np.mean(np.abs(deviations))
+        if not mean_ad:
+            return np.array([], dtype=np.intp)
+        z_scores = deviations / (1.253314 * mean_ad)
+    return np.flatnonzero(z_scores > threshold)
+
+
 class BudgetForecastingService:
     """
     ML service for budget prediction and spending analysis.
     
     Uses:
     - Linear Regression for trend prediction
-    - Isolation Forest for anomaly detection
+    - Robust z-scores (median absolute deviation) for anomaly detection
     - Time series analysis for seasonal patterns
     """
     
+    # Results only change when transactions do, so an hour is a safe upper bound
+    CACHE_TIMEOUT = 3600
+    
     def __init__(self, user=None):
         self.user = user
-        self.scaler = StandardScaler()
+    
+    def _cache_key(self, tag: str, **params) -> str:
+        """
+        Build a cache key for a service result.
+        
+        The key embeds the analytics data version, which every Transaction,
+        Category or User write bumps, so stale entries are never served and
+        simply expire.
+        """
+        raw = repr((
+            self.user.id if self.user else None,
+            tag,
+            sorted(params.items()),
+            get_version(),
+        ))
+        return f"forecasting:{tag}:{hashlib.md5(raw.encode()).hexdigest()}"
     
     def get_spending_forecast(self, months_ahead: int = 3) -> Dict[str, Any]:
         """
@@ -46,19 +107,23 @@ class BudgetForecastingService:
         Returns:
             Dict with monthly predictions and confidence intervals
         """
-        from apps.transactions.models import Transaction
+        return cache.get_or_set(
+            self._cache_key('spending_forecast', months_ahead=months_ahead),
+            lambda: self._compute_spending_forecast(months_ahead),
+            timeout=self.CACHE_TIMEOUT
+        )
+    
+    def _compute_spending_forecast(self, months_ahead: int) -> Dict[str, Any]:
+        # Historical monthly spending from the pre-aggregated summaries,
+        # one row per month instead of a scan over every transaction
+        monthly_data = MonthlySummary.objects.filter(
+            total_spent__gt=0
+        ).values_list('month', 'total_spent').order_by('month')
         
-        # Get historical monthly spending
-        monthly_data = Transaction.objects.filter(
-            transaction_type='expense'
-        ).annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('month')
+        months, totals = zip(*monthly_data) if monthly_data else ((), ())
+        n = len(months)
         
-        if len(monthly_data) < 3:
+        if n < 3:
             return {
                 'success': False,
                 'error': 'Not enough historical data (need at least 3 months)',
@@ -66,60 +131,54 @@ class BudgetForecastingService:
             }
         
         # Prepare data for ML
-        df = pd.DataFrame(list(monthly_data))
-        df['month_num'] = range(len(df))
-        df['total'] = df['total'].astype(float)
-        
-        X = df[['month_num']].values
-        y = df['total'].values
+        x = np.arange(n, dtype=np.float64)
+        y = np.asarray(totals, dtype=np.float64)
         
-        # Train model
-        model = Ridge(alpha=1.0)
-        model.fit(X, y)
+        # Train model (ridge-regularized linear trend)
+        slope, intercept = _fit_linear_1d(x, y, alpha=1.0)
         
         # Calculate confidence based on R² score
-        train_score = model.score(X, y)
+        residuals = y - (slope * x + intercept)
+        ss_res = (residuals ** 2).sum()
+        ss_tot = ((y - y.mean()) ** 2).sum()
+        train_score = 1 - ss_res / ss_tot if ss_tot else 1.0
+        
+        # Calculate prediction interval (simple approach)
+        std_error = float(np.std(residuals))
+        confidence = round(train_score * 100, 1)
         
         # Predict future months
         predictions = []
-        last_month = df['month'].max()
+        last_month = months[-1]
+        future_values = slope * np.arange(n, n + months_ahead, dtype=np.float64) + intercept
         
-        for i in range(1, months_ahead + 1):
-            future_month_num = len(df) + i - 1
-            prediction = model.predict([[future_month_num]])[0]
-            
-            # Calculate prediction interval (simple approach)
-            residuals = y - model.predict(X)
-            std_error = np.std(residuals)
-            
-            future_date = last_month + timedelta(days=32 * i)
-            future_date = future_date.replace(day=1)
+        for i, prediction in enumerate(future_values.tolist(), start=1):
+            future_date = add_months(last_month, i)
             
             predictions.append({
                 'month': future_date.strftime('%Y-%m'),
                 'predicted_spending': round(max(0, prediction), 2),
                 'lower_bound': round(max(0, prediction - 2 * std_error), 2),
                 'upper_bound': round(prediction + 2 * std_error, 2),
-                'confidence': round(train_score * 100, 1)
+                'confidence': confidence
             })
         
         # Calculate trend
-        slope = model.coef_[0]
         trend = 'increasing' if slope > 50 else 'decreasing' if slope < -50 else 'stable'
         
         return {
             'success': True,
-            'historical_months': len(df),
+            'historical_months': n,
             'trend': trend,
             'monthly_change': round(slope, 2),
             'model_accuracy': round(train_score * 100, 1),
             'predictions': predictions,
             'historical_data': [
                 {
-                    'month': row['month'].strftime('%Y-%m'),
-                    'spending': float(row['total'])
+                    'month': month.strftime('%Y-%m'),
+                    'spending': spending
                 }
-                for _, row in df.iterrows()
+                for month, spending in zip(months, y.tolist())
             ]
         }
     
@@ -127,40 +186,45 @@ class BudgetForecastingService:
         """
         Predict spending for a specific category.
         """
-        from apps.transactions.models import Transaction
-        
+        return cache.get_or_set(
+            self._cache_key(
+                'category_forecast',
+                category_id=category_id,
+                weeks_ahead=weeks_ahead
+            ),
+            lambda: self._compute_category_forecast(category_id, weeks_ahead),
+            timeout=self.CACHE_TIMEOUT
+        )
+    
+    def _compute_category_forecast(self, category_id: int, weeks_ahead: int) -> Dict[str, Any]:
         weekly_data = Transaction.objects.filter(
             transaction_type='expense',
             category_id=category_id
         ).annotate(
             week=TruncWeek('date')
-        ).values('week').annotate(
+        ).values_list('week').annotate(
             total=Sum('amount')
         ).order_by('week')
         
-        if len(weekly_data) < 4:
+        weeks, totals = zip(*weekly_data) if weekly_data else ((), ())
+        n = len(weeks)
+        
+        if n < 4:
             return {
                 'success': False,
                 'error': 'Not enough data for this category'
             }
         
-        df = pd.DataFrame(list(weekly_data))
-        df['week_num'] = range(len(df))
-        df['total'] = df['total'].astype(float)
+        x = np.arange(n, dtype=np.float64)
+        y = np.asarray(totals, dtype=np.float64)
         
-        X = df[['week_num']].values
-        y = df['total'].values
-        
-        model = LinearRegression()
-        model.fit(X, y)
+        slope, intercept = _fit_linear_1d(x, y)
         
         predictions = []
-        last_week = df['week'].max()
+        last_week = weeks[-1]
+        future_values = slope * np.arange(n, n + weeks_ahead, dtype=np.float64) + intercept
         
-        for i in range(1, weeks_ahead + 1):
-            future_week_num = len(df) + i - 1
-            prediction = model.predict([[future_week_num]])[0]
-            
+        for i, prediction in enumerate(future_values.tolist(), start=1):
             future_date = last_week + timedelta(weeks=i)
             
             predictions.append({
@@ -175,50 +239,54 @@ class BudgetForecastingService:
     
     def detect_anomalies(self) -> List[Dict[str, Any]]:
         """
-        Detect unusual spending patterns using Isolation Forest.
+        Detect unusually high expenses using a robust (MAD-based) z-score.
         """
-        from apps.transactions.models import Transaction
-        
+        # The 30-day window moves daily, so the date is part of the key
+        return cache.get_or_set(
+            self._cache_key('anomalies', today=timezone.localdate()),
+            self._compute_anomalies,
+            timeout=self.CACHE_TIMEOUT
+        )
+    
+    def _compute_anomalies(self) -> List[Dict[str, Any]]:
         # Get recent transactions
-        thirty_days_ago = timezone.now().date() - timedelta(days=30)
+        thirty_days_ago = timezone.localdate() - timedelta(days=30)
         
-        transactions = Transaction.objects.filter(
+        recent_expenses = Transaction.objects.filter(
             transaction_type='expense',
             date__gte=thirty_days_ago
-        ).values('id', 'amount', 'description', 'merchant', 'category__name', 'date')
-        
-        if len(transactions) < 10:
-            return []
+        )
         
-        df = pd.DataFrame(list(transactions))
-        df['amount'] = df['amount'].astype(float)
+        # Stream only (id, amount) pairs; Decimal -> double conversion happens
+        # inside NumPy's C loop and no per-row dicts are kept in memory
+        scored = np.fromiter(
+            recent_expenses.values_list('id', 'amount').iterator(chunk_size=2000),
+            dtype=[('id', np.int64), ('amount', np.float64)]
+        )
         
-        # Feature engineering
-        X = df[['amount']].values
+        if len(scored) < 10:
+            return []
         
-        # Fit Isolation Forest
-        clf = IsolationForest(
-            contamination=0.1,
-            random_state=42,
-            n_estimators=100
-        )
+        flagged_ids = scored['id'][_mad_outliers(scored['amount'])]
+        if not flagged_ids.size:
+            return []
         
-        predictions = clf.fit_predict(X)
+        # Fetch display fields for the handful of flagged rows only
+        flagged = recent_expenses.filter(
+            id__in=flagged_ids.tolist()
+        ).values('id', 'amount', 'description', 'merchant', 'category__name', 'date')
         
-        # Get anomalies
         anomalies = []
-        for idx, pred in enumerate(predictions):
-            if pred == -1:  # Anomaly
-                row = df.iloc[idx]
-                anomalies.append({
-                    'transaction_id': row['id'],
-                    'amount': row['amount'],
-                    'description': row['description'],
-                    'merchant': row['merchant'],
-                    'category': row['category__name'],
-                    'date': row['date'].strftime('%Y-%m-%d'),
-                    'reason': 'Unusually high amount compared to your spending patterns'
-                })
+        for row in flagged:
+            anomalies.append({
+                'transaction_id': row['id'],
+                'amount': float(row['amount']),
+                'description': row['description'],
+                'merchant': row['merchant'],
+                'category': row['category__name'],
+                'date': row['date'].strftime('%Y-%m-%d'),
+                'reason': 'Unusually high amount compared to your spending patterns'
+            })
         
         return anomalies
     
@@ -226,38 +294,39 @@ class BudgetForecastingService:
         """
         Generate comprehensive spending insights.
         """
-        from apps.transactions.models import Transaction
-        
-        now = timezone.now()
+        # Daily average depends on the current day, so the date is part of the key
+        return cache.get_or_set(
+            self._cache_key('spending_insights', today=timezone.localdate()),
+            self._compute_spending_insights,
+            timeout=self.CACHE_TIMEOUT
+        )
+    
+    def _compute_spending_insights(self) -> Dict[str, Any]:
+        now = timezone.localtime()
         current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
         
-        # Current month spending (no user filtering in no-auth mode)
+        # Current and last month spending in one pass (no user filtering in no-auth mode)
+        this_month = Q(date__gte=current_month_start.date())
         current_month = Transaction.objects.filter(
             transaction_type='expense',
-            date__gte=current_month_start.date()
+            date__gte=last_month_start.date()
         ).aggregate(
-            total=Sum('amount'),
-            count=Count('id'),
-            avg=Avg('amount')
+            total=Sum('amount', filter=this_month),
+            count=Count('id', filter=this_month),
+            avg=Avg('amount', filter=this_month),
+            last_total=Sum('amount', filter=~this_month)
         )
         
-        # Last month spending
-        last_month = Transaction.objects.filter(
-            transaction_type='expense',
-            date__gte=last_month_start.date(),
-            date__lt=current_month_start.date()
-        ).aggregate(total=Sum('amount'))
-        
         # Top spending categories
-        top_categories = Transaction.objects.filter(
+        top_categories = list(Transaction.objects.filter(
             transaction_type='expense',
             date__gte=current_month_start.date()
         ).values(
             'category__name', 'category__icon'
         ).annotate(
             total=Sum('amount')
-        ).order_by('-total')[:5]
+        ).order_by('-total')[:5])
         
         # Daily average
         days_in_month = (now - current_month_start).days or 1
@@ -265,7 +334,7 @@ class BudgetForecastingService:
         
         # Month-over-month change
         current_total = float(current_month['total'] or 0)
-        last_total = float(last_month['total'] or 0)
+        last_total = float(current_month['last_total'] or 0)
         
         if last_total > 0:
             mom_change = ((current_total - last_total) / last_total) * 100
@@ -0,0 +1,21 @@
+"""
+Signal handlers invalidating cached analytics responses.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.transactions.models import Category, Transaction
+
+from .cache import bump_version
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_analytics_cache(sender, **kwargs):
+    bump_version()
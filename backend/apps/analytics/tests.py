@@ -0,0 +1,118 @@
+"""
+Tests for analytics response caching and anomaly scoring.
+"""
+
+import warnings
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import CacheKeyWarning, cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.transactions.models import MonthlySummary, Transaction
+from apps.users.views import get_default_user
+from .cache import bump_version, get_version
+from .services.forecasting import BudgetForecastingService, _mad_outliers
+
+
+class CachedResponseTests(TestCase):
+    
+    def setUp(self):
+        # The default user exists up front, since creating it bumps the version
+        get_default_user()
+        cache.clear()
+        self.client = APIClient()
+    
+    def spent(self):
+        response = self.client.get('/api/analytics/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['total_spent']
+    
+    def test_bump_version_changes_version(self):
+        version = get_version()
+        bump_version()
+        self.assertNotEqual(get_version(), version)
+    
+    def test_transaction_write_invalidates_cached_response(self):
+        self.assertEqual(self.spent(), 0)
+        
+        Transaction.objects.create(
+            amount=Decimal('250'), description='Lunch', date=timezone.localdate()
+        )
+        self.assertEqual(self.spent(), 250)
+    
+    def test_bulk_write_is_served_stale_until_bump(self):
+        self.assertEqual(self.spent(), 0)
+        
+        # bulk_create sends no signals, so the bulk paths refresh the
+        # summary and bump the version themselves
+        Transaction.objects.bulk_create([
+            Transaction(amount=Decimal('100'), description='Tea', date=timezone.localdate())
+        ])
+        MonthlySummary.refresh(timezone.localdate())
+        self.assertEqual(self.spent(), 0)
+        
+        bump_version()
+        self.assertEqual(self.spent(), 100)
+    
+    def test_budget_edit_shows_on_next_dashboard(self):
+        self.client.get('/api/analytics/dashboard/')
+        
+        response = self.client.patch(
+            '/api/users/profile/', {'monthly_budget': '5000.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        data = self.client.get('/api/analytics/dashboard/').json()
+        self.assertEqual(data['monthly_budget'], 5000)
+        self.assertEqual(data['remaining_budget'], 5000)
+    
+    def test_hit_is_one_query(self):
+        self.spent()
+        
+        with self.assertNumQueries(1):
+            self.spent()
+    
+    def test_long_query_string_gets_a_short_key(self):
+        url = '/api/analytics/trends/?' + 'x' * 1000 + '=1'
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class ForecastCacheKeyTests(TestCase):
+    
+    def test_transaction_write_changes_key(self):
+        service = BudgetForecastingService()
+        key = service._cache_key('spending_forecast', months_ahead=3)
+        
+        Transaction.objects.create(
+            amount=Decimal('250'), description='Lunch', date=timezone.localdate()
+        )
+        self.assertNotEqual(service._cache_key('spending_forecast', months_ahead=3), key)
+
+
+class MadOutliersTests(SimpleTestCase):
+    
+    def test_flags_high_outlier(self):
+        amounts = np.array([40, 45, 50, 50, 55, 60, 48, 52, 47, 900], dtype=np.float64)
+        
+        self.assertEqual(_mad_outliers(amounts).tolist(), [9])
+    
+    def test_zero_mad_ignores_ordinary_variation(self):
+        # Mostly repeated amounts make the MAD 0
+        amounts = np.array([50] * 6 + [52, 55, 58, 60], dtype=np.float64)
+        
+        self.assertEqual(_mad_outliers(amounts).tolist(), [])
+    
+    def test_zero_mad_still_flags_real_outlier(self):
+        amounts = np.array([50] * 6 + [52, 55, 58, 500], dtype=np.float64)
+        
+        self.assertEqual(_mad_outliers(amounts).tolist(), [9])
+    
+    def test_identical_amounts_have_no_outliers(self):
+        self.assertEqual(_mad_outliers(np.full(10, 50.0)).tolist(), [])
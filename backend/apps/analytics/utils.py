@@ -0,0 +1,14 @@
+"""
+Date helpers shared by the analytics views and services.
+"""
+
+
+def add_months(month_start, months: int):
+    """
+    Shift a first-of-month date or datetime by whole calendar months.
+    
+    Works on the (year, month) pair directly, so unlike adding multiples of
+    30 or 32 days it never skips or repeats a month.
+    """
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1)
@@ -5,59 +5,62 @@ Views for Analytics using real transaction data.
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from django.contrib.auth import get_user_model
-from django.db.models import Sum, Count, Avg, Q
+from django.db.models import Sum, Count, Avg, Q, FloatField
+from django.db.models.functions import Cast, TruncHour, TruncMonth
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
-from apps.transactions.models import Transaction, Category
-from apps.users.models import UserPreferences
+from apps.transactions.models import Transaction, Category, MonthlySummary
+from apps.users.views import get_default_user
+from .cache import cached_response
+from .renderers import ORJSONRenderer
+from .utils import add_months
 
-User = get_user_model()
+# Amounts are aggregated as floats: these views only format the totals, and
+# float sums skip Decimal arithmetic in both the DB driver and Python
+AMOUNT = Cast('amount', FloatField())
 
-def get_default_user():
-    """Get or create a default user for Single User Mode."""
-    user = User.objects.first()
-    if not user:
-        user = User.objects.create_user(
-            username='user',
-            email='user@example.com',
-            password='password'
-        )
-        UserPreferences.objects.create(user=user)
-    return user
+
+def _compute_change(current: float, previous: float) -> dict:
+    """Absolute and percentage change between two period totals."""
+    change_amount = current - previous
+    if previous > 0:
+        change_percentage = (change_amount / previous) * 100
+    else:
+        change_percentage = 100 if current > 0 else 0
+    
+    return {
+        'amount': round(change_amount, 2),
+        'percentage': round(change_percentage, 1),
+        # (current > previous) - (current < previous) is 1, -1 or 0
+        'direction': ('stable', 'increase', 'decrease')[(current > previous) - (current < previous)]
+    }
 
 
 class DashboardStatsView(APIView):
     """Get dashboard statistics."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    @cached_response
     def get(self, request):
         user = get_default_user()
         
-        # Get current month stats
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        monthly_transactions = Transaction.objects.filter(
-            date__gte=month_start
-        )
-        
-        total_spent = monthly_transactions.filter(
-            transaction_type='expense'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        # Get current month stats; the month turns over at local midnight
+        month_start = timezone.localdate().replace(day=1)
         
-        total_income = monthly_transactions.filter(
-            transaction_type='income'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        # Totals are maintained by the Transaction signals
+        summary = MonthlySummary.for_month(month_start)
+        monthly_budget = user.monthly_budget or Decimal('0')
         
+        # Decimals go to the renderer as they are; it writes them as JSON numbers
         return Response({
-            'monthly_budget': float(user.monthly_budget),
-            'total_spent': float(total_spent),
-            'total_income': float(total_income),
-            'remaining_budget': float(user.monthly_budget) - float(total_spent),
-            'transaction_count': monthly_transactions.count(),
+            'monthly_budget': monthly_budget,
+            'total_spent': summary.total_spent,
+            'total_income': summary.total_income,
+            'remaining_budget': monthly_budget - summary.total_spent,
+            'transaction_count': summary.transaction_count,
         })
 
 
@@ -65,44 +68,54 @@ class MonthlyTrendsView(APIView):
     """Get monthly spending trends for the last 6 months."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    @cached_response
     def get(self, request):
         months = int(request.query_params.get('months', 6))
         months = min(max(months, 1), 12)
         
-        now = timezone.now()
-        trends = []
+        # First day of each month in the window, oldest first
+        current_month = timezone.localdate().replace(day=1)
+        month_starts = [add_months(current_month, -i) for i in range(months - 1, -1, -1)]
         
-        for i in range(months - 1, -1, -1):
-            # Calculate month boundaries
-            month_date = now - timedelta(days=30 * i)
-            month_start = month_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            # Get next month start
-            if month_start.month == 12:
-                next_month = month_start.replace(year=month_start.year + 1, month=1)
-            else:
-                next_month = month_start.replace(month=month_start.month + 1)
-            
-            # Get transactions for this month
-            month_transactions = Transaction.objects.filter(
-                date__gte=month_start.date(),
-                date__lt=next_month.date(),
+        # One GROUP BY over the whole window instead of two queries per month
+        monthly_totals = {
+            row['month']: row
+            for row in Transaction.objects.filter(
+                date__gte=month_starts[0],
                 transaction_type='expense'
-            )
-            
-            total = month_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+            ).annotate(
+                month=TruncMonth('date')
+            ).values('month').annotate(
+                total=Sum(AMOUNT),
+                count=Count('id')
+            ).order_by()
+        }
+        
+        # Totals for the averages are accumulated while building the rows
+        trends = []
+        total_sum = recent_sum = older_sum = 0
+        for idx, month_start in enumerate(month_starts):
+            row = monthly_totals.get(month_start, {})
+            spending = row.get('total') or 0.0
             
             trends.append({
                 'month': month_start.strftime('%b %Y'),
-                'spending': float(total),
-                'transaction_count': month_transactions.count()
+                'spending': spending,
+                'transaction_count': row.get('count', 0)
             })
+            
+            total_sum += spending
+            if idx >= months - 2:
+                recent_sum += spending
+            if idx < 2:
+                older_sum += spending
         
         # Calculate trend direction
-        if len(trends) >= 2:
-            recent_avg = sum(t['spending'] for t in trends[-2:]) / 2
-            older_avg = sum(t['spending'] for t in trends[:2]) / 2 if len(trends) >= 2 else recent_avg
+        if months >= 2:
+            recent_avg = recent_sum / 2
+            older_avg = older_sum / 2
             
             if recent_avg > older_avg * 1.1:
                 trend = 'increasing'
@@ -113,7 +126,7 @@ class MonthlyTrendsView(APIView):
         else:
             trend = 'stable'
         
-        avg_spending = sum(t['spending'] for t in trends) / len(trends) if trends else 0
+        avg_spending = total_sum / months
         
         return Response({
             'trends': trends,
@@ -127,46 +140,59 @@ class CategoryBreakdownView(APIView):
     """Get spending breakdown by category."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    @cached_response
     def get(self, request):
         days = int(request.query_params.get('days', 30))
+        limit = int(request.query_params.get('limit', 20))
+        
         days = min(max(days, 1), 365)
+        limit = min(max(limit, 1), 50)
         
-        cutoff_date = timezone.now().date() - timedelta(days=days)
+        cutoff_date = timezone.localdate() - timedelta(days=days)
         
-        # Get category spending
-        category_data = Transaction.objects.filter(
+        period_expenses = Transaction.objects.filter(
             date__gte=cutoff_date,
             transaction_type='expense'
-        ).values(
+        )
+        
+        # Grand total over every category, so percentages stay meaningful
+        # when the breakdown itself is capped
+        total_spending = period_expenses.aggregate(
+            total=Sum(AMOUNT)
+        )['total'] or 0.0
+        
+        # Get category spending, largest first, capped at `limit` groups
+        category_data = period_expenses.values(
             'category__name',
             'category__icon',
             'category__color'
         ).annotate(
-            total=Sum('amount'),
+            total=Sum(AMOUNT),
             count=Count('id')
-        ).order_by('-total')
-        
-        total_spending = sum(item['total'] for item in category_data if item['total'])
+        ).order_by('-total')[:limit]
         
         breakdown = []
         for item in category_data:
-            if item['total']:
-                breakdown.append({
-                    'category': item['category__name'] or 'Uncategorized',
-                    'icon': item['category__icon'] or '📦',
-                    'color': item['category__color'] or '#6366f1',
-                    'amount': float(item['total']),
-                    'count': item['count'],
-                    'percentage': round((float(item['total']) / float(total_spending) * 100), 1) if total_spending else 0
-                })
+            if not item['total']:
+                continue
+            amount = item['total']
+            breakdown.append({
+                'category': item['category__name'] or 'Uncategorized',
+                'icon': item['category__icon'] or '📦',
+                'color': item['category__color'] or '#6366f1',
+                'amount': amount,
+                'count': item['count'],
+                'percentage': round((amount / total_spending * 100), 1) if total_spending else 0
+            })
         
         # Get top category
         top_category = breakdown[0] if breakdown else None
         
         return Response({
             'breakdown': breakdown,
-            'total_spending': float(total_spending) if total_spending else 0,
+            'total_spending': total_spending,
             'top_category': top_category,
             'period_days': days
         })
@@ -176,7 +202,9 @@ class TopExpensesView(APIView):
     """Get top expenses in a given period."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    @cached_response
     def get(self, request):
         days = int(request.query_params.get('days', 30))
         limit = int(request.query_params.get('limit', 10))
@@ -184,24 +212,27 @@ class TopExpensesView(APIView):
         days = min(max(days, 1), 365)
         limit = min(max(limit, 1), 50)
         
-        cutoff_date = timezone.now().date() - timedelta(days=days)
+        cutoff_date = timezone.localdate() - timedelta(days=days)
         
         top_transactions = Transaction.objects.filter(
             date__gte=cutoff_date,
             transaction_type='expense'
-        ).select_related('category').order_by('-amount')[:limit]
+        ).order_by('-amount').values(
+            'id', 'amount', 'description', 'merchant', 'date',
+            'category__name', 'category__icon'
+        )[:limit]
         
         expenses = []
         for txn in top_transactions:
             expenses.append({
-                'id': txn.id,
-                'amount': float(txn.amount),
-                'description': txn.description,
-                'merchant': txn.merchant or 'N/A',
-                'category': txn.category.name if txn.category else 'Uncategorized',
-                'category_icon': txn.category.icon if txn.category else '📦',
-                'date': txn.date.strftime('%Y-%m-%d'),
-                'date_display': txn.date.strftime('%b %d, %Y')
+                'id': txn['id'],
+                'amount': float(txn['amount']),
+                'description': txn['description'],
+                'merchant': txn['merchant'] or 'N/A',
+                'category': txn['category__name'] or 'Uncategorized',
+                'category_icon': txn['category__icon'] or '📦',
+                'date': txn['date'].strftime('%Y-%m-%d'),
+                'date_display': txn['date'].strftime('%b %d, %Y')
             })
         
         # Calculate average of top expenses
@@ -219,69 +250,47 @@ class SpendingComparisonView(APIView):
     """Compare current month with previous month."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    @cached_response
     def get(self, request):
-        now = timezone.now()
-        
         # Current month
-        current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        current_month_start = timezone.localdate().replace(day=1)
         
         # Previous month
-        if current_month_start.month == 1:
-            prev_month_start = current_month_start.replace(year=current_month_start.year - 1, month=12)
-        else:
-            prev_month_start = current_month_start.replace(month=current_month_start.month - 1)
+        prev_month_start = add_months(current_month_start, -1)
         
-        # Current month spending
-        current_spending = Transaction.objects.filter(
-            date__gte=current_month_start.date(),
+        # Current and previous month spending in one pass
+        this_month = Q(date__gte=current_month_start)
+        spending = Transaction.objects.filter(
+            date__gte=prev_month_start,
             transaction_type='expense'
         ).aggregate(
-            total=Sum('amount'),
-            count=Count('id'),
-            avg=Avg('amount')
+            total=Sum(AMOUNT, filter=this_month),
+            count=Count('id', filter=this_month),
+            avg=Avg(AMOUNT, filter=this_month),
+            prev_total=Sum(AMOUNT, filter=~this_month),
+            prev_count=Count('id', filter=~this_month),
+            prev_avg=Avg(AMOUNT, filter=~this_month)
         )
         
-        # Previous month spending
-        prev_spending = Transaction.objects.filter(
-            date__gte=prev_month_start.date(),
-            date__lt=current_month_start.date(),
-            transaction_type='expense'
-        ).aggregate(
-            total=Sum('amount'),
-            count=Count('id'),
-            avg=Avg('amount')
-        )
-        
-        current_total = float(current_spending['total'] or 0)
-        prev_total = float(prev_spending['total'] or 0)
-        
-        # Calculate change
-        if prev_total > 0:
-            change_amount = current_total - prev_total
-            change_percentage = (change_amount / prev_total) * 100
-        else:
-            change_amount = current_total
-            change_percentage = 100 if current_total > 0 else 0
+        current_total = spending['total'] or 0.0
+        prev_total = spending['prev_total'] or 0.0
         
         return Response({
             'current_month': {
                 'total': current_total,
-                'count': current_spending['count'] or 0,
-                'average': float(current_spending['avg'] or 0),
+                'count': spending['count'] or 0,
+                'average': spending['avg'] or 0.0,
                 'month': current_month_start.strftime('%B %Y')
             },
             'previous_month': {
                 'total': prev_total,
-                'count': prev_spending['count'] or 0,
-                'average': float(prev_spending['avg'] or 0),
+                'count': spending['prev_count'] or 0,
+                'average': spending['prev_avg'] or 0.0,
                 'month': prev_month_start.strftime('%B %Y')
             },
-            'change': {
-                'amount': round(change_amount, 2),
-                'percentage': round(change_percentage, 1),
-                'direction': 'increase' if change_amount > 0 else 'decrease' if change_amount < 0 else 'stable'
-            }
+            'change': _compute_change(current_total, prev_total)
         })
 
 
@@ -289,81 +298,65 @@ class WeeklyAnalyticsView(APIView):
     """Get weekly spending analytics."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    @cached_response
     def get(self, request):
-        now = timezone.now()
+        now = timezone.localtime()
+        
+        today = now.date()
         
         # Current week (last 7 days)
-        week_start = now - timedelta(days=7)
+        week_start = today - timedelta(days=7)
         
         # Previous week
-        prev_week_start = now - timedelta(days=14)
-        prev_week_end = week_start
-        
-        # Current week spending
-        current_week = Transaction.objects.filter(
-            date__gte=week_start.date(),
-            transaction_type='expense'
-        ).aggregate(
-            total=Sum('amount'),
-            count=Count('id'),
-            avg=Avg('amount')
-        )
+        prev_week_start = today - timedelta(days=14)
         
-        # Previous week spending
-        prev_week = Transaction.objects.filter(
-            date__gte=prev_week_start.date(),
-            date__lt=prev_week_end.date(),
+        # Both weeks in one query, grouped by day and bucketed in Python
+        daily_rows = Transaction.objects.filter(
+            date__gte=prev_week_start,
             transaction_type='expense'
-        ).aggregate(
-            total=Sum('amount'),
-            count=Count('id'),
-            avg=Avg('amount')
-        )
+        ).values('date').annotate(
+            total=Sum(AMOUNT),
+            count=Count('id')
+        ).order_by()
         
-        current_total = float(current_week['total'] or 0)
-        prev_total = float(prev_week['total'] or 0)
+        current_week = {'total': 0.0, 'count': 0}
+        prev_week = {'total': 0.0, 'count': 0}
+        daily_totals = {}
+        for row in daily_rows:
+            week = current_week if row['date'] >= week_start else prev_week
+            week['total'] += row['total']
+            week['count'] += row['count']
+            daily_totals[row['date']] = row['total']
         
-        # Calculate change
-        if prev_total > 0:
-            change_amount = current_total - prev_total
-            change_percentage = (change_amount / prev_total) * 100
-        else:
-            change_amount = current_total
-            change_percentage = 100 if current_total > 0 else 0
+        current_total = current_week['total']
+        prev_total = prev_week['total']
         
         # Daily breakdown for current week
         daily_breakdown = []
         for i in range(7):
             day = now - timedelta(days=6-i)
-            day_spending = Transaction.objects.filter(
-                date=day.date(),
-                transaction_type='expense'
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
             
             daily_breakdown.append({
                 'date': day.strftime('%Y-%m-%d'),
                 'day': day.strftime('%a'),
-                'spending': float(day_spending)
+                'spending': daily_totals.get(day.date(), 0.0)
             })
         
         return Response({
             'current_week': {
                 'total': current_total,
-                'count': current_week['count'] or 0,
-                'average': float(current_week['avg'] or 0),
+                'count': current_week['count'],
+                'average': current_total / current_week['count'] if current_week['count'] else 0,
                 'daily_average': current_total / 7 if current_total > 0 else 0
             },
             'previous_week': {
                 'total': prev_total,
-                'count': prev_week['count'] or 0,
-                'average': float(prev_week['avg'] or 0)
-            },
-            'change': {
-                'amount': round(change_amount, 2),
-                'percentage': round(change_percentage, 1),
-                'direction': 'increase' if change_amount > 0 else 'decrease' if change_amount < 0 else 'stable'
+                'count': prev_week['count'],
+                'average': prev_total / prev_week['count'] if prev_week['count'] else 0
             },
+            'change': _compute_change(current_total, prev_total),
             'daily_breakdown': daily_breakdown
         })
 
@@ -372,91 +365,76 @@ class DailyAnalyticsView(APIView):
     """Get daily spending analytics."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    @cached_response
     def get(self, request):
-        now = timezone.now()
+        now = timezone.localtime()
         today = now.date()
         yesterday = today - timedelta(days=1)
         
-        # Today's spending
-        today_spending = Transaction.objects.filter(
-            date=today,
+        # This month's daily average
+        month_start = today.replace(day=1)
+        days_in_month = (today - month_start).days + 1
+        
+        # Today, yesterday and month-to-date in one pass; yesterday can fall
+        # in the previous month, so the scan starts at whichever is earlier
+        is_today = Q(date=today)
+        is_yesterday = Q(date=yesterday)
+        spending = Transaction.objects.filter(
+            date__gte=min(month_start, yesterday),
             transaction_type='expense'
         ).aggregate(
-            total=Sum('amount'),
-            count=Count('id')
+            today_total=Sum(AMOUNT, filter=is_today),
+            today_count=Count('id', filter=is_today),
+            yesterday_total=Sum(AMOUNT, filter=is_yesterday),
+            yesterday_count=Count('id', filter=is_yesterday),
+            month_total=Sum(AMOUNT, filter=Q(date__gte=month_start))
         )
         
-        # Yesterday's spending
-        yesterday_spending = Transaction.objects.filter(
-            date=yesterday,
-            transaction_type='expense'
-        ).aggregate(
-            total=Sum('amount'),
-            count=Count('id')
-        )
+        month_total = spending['month_total'] or 0.0
+        daily_average = month_total / days_in_month if days_in_month > 0 else 0
         
-        # This month's daily average
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        days_in_month = (now - month_start).days + 1
+        today_total = spending['today_total'] or 0.0
+        yesterday_total = spending['yesterday_total'] or 0.0
         
-        month_total = Transaction.objects.filter(
-            date__gte=month_start.date(),
+        # Hourly breakdown for today, bucketed in local hours like `now`
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        hourly_spending = Transaction.objects.filter(
+            created_at__gte=day_start,
+            created_at__lt=day_start + timedelta(days=1),
+            date=today,
             transaction_type='expense'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        daily_average = float(month_total) / days_in_month if days_in_month > 0 else 0
-        
-        today_total = float(today_spending['total'] or 0)
-        yesterday_total = float(yesterday_spending['total'] or 0)
-        
-        # Calculate change from yesterday
-        if yesterday_total > 0:
-            change_amount = today_total - yesterday_total
-            change_percentage = (change_amount / yesterday_total) * 100
-        else:
-            change_amount = today_total
-            change_percentage = 100 if today_total > 0 else 0
-        
-        # Hourly breakdown for today (if there are transactions)
-        hourly_breakdown = []
-        if today_total > 0:
-            for hour in range(24):
-                hour_start = now.replace(hour=hour, minute=0, second=0, microsecond=0)
-                hour_end = hour_start + timedelta(hours=1)
-                
-                hour_spending = Transaction.objects.filter(
-                    created_at__gte=hour_start,
-                    created_at__lt=hour_end,
-                    date=today,
-                    transaction_type='expense'
-                ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-                
-                if hour_spending > 0:
-                    hourly_breakdown.append({
-                        'hour': hour,
-                        'time': hour_start.strftime('%I %p'),
-                        'spending': float(hour_spending)
-                    })
+        ).annotate(
+            hour=TruncHour('created_at', tzinfo=now.tzinfo)
+        ).values('hour').annotate(
+            total=Sum(AMOUNT)
+        ).order_by('hour')
+        
+        hourly_breakdown = [
+            {
+                'hour': row['hour'].hour,
+                'time': row['hour'].strftime('%I %p'),
+                'spending': row['total']
+            }
+            for row in hourly_spending
+            if row['total'] > 0
+        ]
         
         return Response({
             'today': {
                 'total': today_total,
-                'count': today_spending['count'] or 0,
+                'count': spending['today_count'] or 0,
                 'date': today.strftime('%Y-%m-%d'),
                 'date_display': today.strftime('%B %d, %Y')
             },
             'yesterday': {
                 'total': yesterday_total,
-                'count': yesterday_spending['count'] or 0,
+                'count': spending['yesterday_count'] or 0,
                 'date': yesterday.strftime('%Y-%m-%d'),
                 'date_display': yesterday.strftime('%B %d, %Y')
             },
-            'change': {
-                'amount': round(change_amount, 2),
-                'percentage': round(change_percentage, 1),
-                'direction': 'increase' if change_amount > 0 else 'decrease' if change_amount < 0 else 'stable'
-            },
+            'change': _compute_change(today_total, yesterday_total),
             'monthly_daily_average': round(daily_average, 2),
             'hourly_breakdown': hourly_breakdown
         })
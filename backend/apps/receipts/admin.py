@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import Receipt, ReceiptItem
 
 
@@ -9,8 +10,17 @@ class ReceiptItemInline(admin.TabularInline):
 
 @admin.register(Receipt)
 class ReceiptAdmin(admin.ModelAdmin):
-    list_display = ['user', 'merchant_name', 'total_amount', 'status', 'created_at']
+    list_display = ['user', 'merchant_name', 'total_amount', 'items_count', 'status', 'created_at']
+    list_select_related = ['user']
     list_filter = ['status', 'created_at']
     search_fields = ['merchant_name', 'raw_text']
     inlines = [ReceiptItemInline]
     readonly_fields = ['raw_text', 'items', 'ai_confidence', 'processed_at']
+    
+    def get_queryset(self, request):
+        # Count line items in the changelist query rather than once per row
+        return super().get_queryset(request).annotate(_items_count=Count('line_items'))
+    
+    @admin.display(description='Items', ordering='_items_count')
+    def items_count(self, obj):
+        return obj._items_count
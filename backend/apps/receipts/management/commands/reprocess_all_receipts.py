@@ -0,0 +1,52 @@
+"""
+Management command to re-run OCR over stored receipts.
+
+Receipts are sent to Tesseract in batches through its list-file input, so
+start-up cost is paid once per batch instead of once per receipt.
+
+Uploads are processed by an in-process worker pool, so receipts still queued
+or mid-OCR when a worker restarts stay 'pending'/'processing'. Recover them
+with:
+
+    python manage.py reprocess_all_receipts --status pending processing
+"""
+
+from django.core.management.base import BaseCommand
+from apps.receipts.models import Receipt
+from apps.receipts.services.ocr_service import ReceiptOCRService
+from apps.receipts.services.processing import process_receipts_batch
+
+
+class Command(BaseCommand):
+    help = 'Re-runs OCR on stored receipts in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status',
+            nargs='+',
+            help='Only reprocess receipts with these statuses (e.g. failed)',
+        )
+
+    def handle(self, *args, **options):
+        receipts = Receipt.objects.order_by('pk')
+        if options['status']:
+            receipts = receipts.filter(status__in=options['status'])
+
+        batch_size = ReceiptOCRService.BATCH_SIZE
+        batch = []
+        processed = 0
+
+        for receipt in receipts.iterator():
+            batch.append(receipt)
+            if len(batch) == batch_size:
+                process_receipts_batch(batch)
+                processed += len(batch)
+                batch = []
+
+        if batch:
+            process_receipts_batch(batch)
+            processed += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Reprocessed {processed} receipts')
+        )
@@ -25,24 +25,51 @@ class ReceiptSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'image', 'image_url', 'thumbnail', 'status', 'error_message',
             'raw_text', 'merchant_name', 'total_amount', 'subtotal', 'tax_amount',
-            'receipt_date', 'items', 'line_items', 'ai_confidence', 'suggested_category',
+            'receipt_date', 'line_items', 'ai_confidence', 'suggested_category',
             'created_at', 'processed_at'
         ]
         read_only_fields = [
             'id', 'thumbnail', 'status', 'error_message', 'raw_text',
             'merchant_name', 'total_amount', 'subtotal', 'tax_amount',
-            'receipt_date', 'items', 'ai_confidence', 'suggested_category',
+            'receipt_date', 'ai_confidence', 'suggested_category',
             'created_at', 'processed_at'
         ]
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Prefetch nested line items so lists don't query once per receipt."""
+        return queryset.prefetch_related('line_items')
+    
     def get_image_url(self, obj):
         if obj.image:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.image.url)
+                url = obj.image.url
+                if not url.startswith('/'):
+                    # Storage already returns an absolute URL
+                    return request.build_absolute_uri(url)
+                
+                # Build scheme + host once; the child serializer is shared by
+                # every row of a list response
+                if not hasattr(self, '_url_prefix'):
+                    self._url_prefix = request.build_absolute_uri('/').rstrip('/')
+                return f"{self._url_prefix}{url}"
         return None
 
 
+class ReceiptListSerializer(serializers.ModelSerializer):
+    """Compact serializer for receipt lists; full data comes from the detail view."""
+    
+    class Meta:
+        model = Receipt
+        fields = ['id', 'thumbnail', 'merchant_name', 'total_amount', 'status', 'created_at']
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load only the listed columns, skipping raw_text and the items JSON."""
+        return queryset.only(*cls.Meta.fields)
+
+
 class ReceiptUploadSerializer(serializers.ModelSerializer):
     """Serializer for uploading receipts."""
     
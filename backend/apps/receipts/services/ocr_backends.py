@@ -0,0 +1,217 @@
+"""
+OCR engines used by ReceiptOCRService.
+
+Tesseract is the default and runs anywhere. PaddleOCR (PP-OCR) can be
+selected with RECEIPT_OCR_BACKEND = 'paddle' on GPU hosts, where it is much
+faster for large reprocessing runs. Both turn preprocessed images into
+plain text, one receipt line per line.
+"""
+
+import os
+import logging
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _tesseract_available() -> bool:
+    """Check once per process whether Tesseract is installed."""
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        logger.warning("Tesseract not available. Install with: brew install tesseract")
+        return False
+
+
+@lru_cache(maxsize=None)
+def _paddle_available() -> bool:
+    """Check once per process whether PaddleOCR is installed."""
+    try:
+        import paddleocr  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("PaddleOCR not available. Install with: pip install paddleocr paddlepaddle-gpu")
+        return False
+
+
+class TesseractBackend:
+    """CPU OCR through the Tesseract binary."""
+    
+    # Configure Tesseract for receipt-like documents: LSTM engine only,
+    # single-column layout, and no inversion pass on the pre-binarized input
+    CONFIG = r'--oem 1 --psm 4 -c preserve_interword_spaces=1 -c tessedit_do_invert=0'
+    # Words Tesseract is less sure of than this (0-100) are treated as noise
+    MIN_WORD_CONFIDENCE = 40
+    
+    def is_available(self) -> bool:
+        return _tesseract_available()
+    
+    def extract_text(self, image: Image.Image) -> str:
+        """OCR a single image."""
+        import pytesseract
+        
+        data = pytesseract.image_to_data(
+            image,
+            config=self.CONFIG,
+            lang='eng',
+            output_type=pytesseract.Output.DICT
+        )
+        
+        return self._text_from_data(data).get(1, '')
+    
+    def extract_batch(self, images: List[Image.Image]) -> List[str]:
+        """
+        OCR several images with one Tesseract run.
+        
+        Start-up is a large share of a single call, so the images are
+        passed as a list file instead of one invocation per receipt.
+        """
+        import pytesseract
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for index, image in enumerate(images):
+                path = os.path.join(tmpdir, f'{index}.png')
+                image.save(path)
+                paths.append(path)
+            
+            list_path = os.path.join(tmpdir, 'list.txt')
+            with open(list_path, 'w') as list_file:
+                list_file.write('\n'.join(paths))
+            
+            data = pytesseract.image_to_data(
+                list_path,
+                config=self.CONFIG,
+                lang='eng',
+                output_type=pytesseract.Output.DICT
+            )
+        
+        # Each listed image is one page, numbered from 1 in list order
+        pages = self._text_from_data(data)
+        return [pages.get(page_num, '') for page_num in range(1, len(images) + 1)]
+    
+    def _text_from_data(self, data: Dict[str, List]) -> Dict[int, str]:
+        """
+        Rebuild text per page from Tesseract word data.
+        
+        Words below MIN_WORD_CONFIDENCE are dropped as OCR noise, and the
+        rest are joined one line per Tesseract text line, in reading order.
+        """
+        lines = {}
+        for page, block, paragraph, line, word, confidence in zip(
+            data['page_num'], data['block_num'], data['par_num'],
+            data['line_num'], data['text'], data['conf']
+        ):
+            if float(confidence) < self.MIN_WORD_CONFIDENCE or not word.strip():
+                continue
+            lines.setdefault((page, block, paragraph, line), []).append(word)
+        
+        pages = {}
+        for (page, *_), words in lines.items():
+            pages.setdefault(page, []).append(' '.join(words))
+        
+        return {page: '\n'.join(page_lines) for page, page_lines in pages.items()}
+
+
+class PaddleOCRBackend:
+    """GPU OCR through PaddleOCR's PP-OCR detection and recognition models."""
+    
+    # Recognition scores below this (0-1) are treated as noise
+    MIN_CONFIDENCE = 0.4
+    
+    def __init__(self):
+        self._engine = None
+        # The predictors aren't thread-safe, and loading them is expensive
+        self._lock = threading.Lock()
+    
+    def is_available(self) -> bool:
+        return _paddle_available()
+    
+    def extract_text(self, image: Image.Image) -> str:
+        """OCR a single image."""
+        return self.extract_batch([image])[0]
+    
+    def extract_batch(self, images: List[Image.Image]) -> List[str]:
+        """
+        OCR several images.
+        
+        Receipts differ in size, so they are fed one at a time; PaddleOCR
+        batches the detected text lines of each receipt for recognition.
+        """
+        texts = []
+        with self._lock:
+            engine = self._get_engine()
+            for image in images:
+                result = engine.ocr(np.asarray(image.convert('L')), cls=False)
+                texts.append(self._text_from_result(result[0] or []))
+        
+        return texts
+    
+    def _get_engine(self):
+        if self._engine is None:
+            from paddleocr import PaddleOCR
+            self._engine = PaddleOCR(
+                use_gpu=True,
+                lang='en',
+                det_db_box_thresh=0.5,
+                use_angle_cls=False,
+                show_log=False
+            )
+        return self._engine
+    
+    def _text_from_result(self, detections: List) -> str:
+        """
+        Join detected text boxes into lines.
+        
+        PaddleOCR returns one box per text run, so an item name and its
+        price come back separately; boxes whose vertical centres are within
+        half a box height are put on one line, left to right.
+        """
+        rows = []
+        for box, (text, confidence) in sorted(detections, key=lambda d: d[0][0][1]):
+            if confidence < self.MIN_CONFIDENCE or not text.strip():
+                continue
+            
+            top = min(point[1] for point in box)
+            bottom = max(point[1] for point in box)
+            left = min(point[0] for point in box)
+            centre = (top + bottom) / 2
+            
+            if rows and abs(centre - rows[-1][0]) < (bottom - top) / 2:
+                rows[-1][1].append((left, text))
+            else:
+                rows.append((centre, [(left, text)]))
+        
+        return '\n'.join(
+            ' '.join(text for _, text in sorted(words))
+            for _, words in rows
+        )
+
+
+BACKENDS = {
+    'tesseract': TesseractBackend,
+    'paddle': PaddleOCRBackend,
+}
+
+
+@lru_cache(maxsize=1)
+def get_ocr_backend():
+    """The OCR engine named by settings.RECEIPT_OCR_BACKEND, shared per process."""
+    name = getattr(settings, 'RECEIPT_OCR_BACKEND', 'tesseract')
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown RECEIPT_OCR_BACKEND {name!r}; choose one of {', '.join(BACKENDS)}"
+        )
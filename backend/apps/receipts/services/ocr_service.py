@@ -3,7 +3,7 @@ Receipt OCR Service using Tesseract and AI.
 
 This service:
 1. Preprocesses receipt images for better OCR accuracy
-2. Extracts text using Tesseract OCR
+2. Extracts text using Tesseract OCR (or PaddleOCR, see ocr_backends)
 3. Parses extracted text using AI to identify:
    - Merchant name
    - Individual items with prices
@@ -12,26 +12,65 @@ This service:
 """
 
 import re
+import calendar
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Optional, List
 from decimal import Decimal
 from io import BytesIO
 
-from PIL import Image, ImageEnhance, ImageFilter
+import numpy as np
+from PIL import Image
 from django.conf import settings
 from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.db.models.fields.files import FieldFile
+
+from config.tracing import span
+from .ocr_backends import get_ocr_backend
 
 logger = logging.getLogger(__name__)
 
 
+# Sample receipt returned when no OCR engine is installed
+_MOCK_RECEIPT_TEXT = """
+        STARBUCKS COFFEE
+        123 MG Road, Bangalore
+        
+        Date: 15/01/2026
+        
+        Caffe Latte Grande     ₹285.00
+        Chocolate Muffin       ₹165.00
+        Bottled Water          ₹45.00
+        
+        Subtotal:              ₹495.00
+        CGST (2.5%):           ₹12.38
+        SGST (2.5%):           ₹12.38
+        
+        TOTAL:                 ₹519.76
+        
+        Thank you for visiting!
+        """
+
+
+def _compile_keyword_amount(keywords: List[str], amount_pattern: str, prefix: str = '') -> re.Pattern:
+    """
+    Compile a single 'keyword: amount' pattern for a group of keywords.
+    
+    Keywords only match as whole words and are tried longest first, so
+    'grand total' wins over 'total' and 'total' doesn't match 'subtotal'.
+    """
+    alternation = '|'.join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+    return re.compile(rf'{prefix}\b(?:{alternation})\b[:\s]*' + amount_pattern, re.IGNORECASE)
+
+
 class ReceiptOCRService:
     """
     Service for extracting data from receipt images.
     
     Workflow:
     1. Preprocess image (enhance contrast, convert to grayscale)
-    2. Run Tesseract OCR to extract raw text
+    2. Run the configured OCR backend (Tesseract by default) to extract raw text
     3. Use regex patterns to extract structured data
     4. Optionally use AI for better parsing
     """
@@ -39,25 +78,49 @@ class ReceiptOCRService:
     # Common patterns in receipts
     AMOUNT_PATTERN = r'[₹$]?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
     DATE_PATTERNS = [
-        r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-        r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})',
+        r'((\d{1,2})([-/])(\d{1,2})([-/])(\d{2,4}))',
+        r'((\d{1,2})\s+((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*)\s+(\d{2,4}))',
     ]
+    # Abbreviated and full month names, as accepted by strptime's %b and %B
+    MONTH_NUMBERS = {
+        **{name.lower(): number for number, name in enumerate(calendar.month_abbr) if name},
+        **{name.lower(): number for number, name in enumerate(calendar.month_name) if name},
+    }
     TOTAL_KEYWORDS = ['total', 'grand total', 'amount due', 'total amount', 'net amount']
     TAX_KEYWORDS = ['tax', 'gst', 'cgst', 'sgst', 'vat', 'igst']
     SUBTOTAL_KEYWORDS = ['subtotal', 'sub total', 'sub-total', 'amount before tax']
+    ADDRESS_WORDS = ['road', 'street', 'date', 'time', 'tel']
     
-    def __init__(self):
-        self.tesseract_available = self._check_tesseract()
+    # Receipts larger than this are rejected rather than decoded
+    MAX_IMAGE_PIXELS = 50_000_000
+    # JPEGs are decoded no smaller than this, which still leaves text legible
+    OCR_DRAFT_SIZE = (2000, 2000)
+    # Receipts per OCR batch; Tesseract can hang on longer list files
+    BATCH_SIZE = 50
     
-    def _check_tesseract(self) -> bool:
-        """Check if Tesseract is installed."""
-        try:
-            import pytesseract
-            pytesseract.get_tesseract_version()
-            return True
-        except Exception:
-            logger.warning("Tesseract not available. Install with: brew install tesseract")
-            return False
+    # Input levels for the preprocessing lookup table
+    _GRAY_LEVELS = np.arange(256, dtype=np.int16)
+    
+    # Compiled once at import instead of on every receipt
+    NON_DIGITS_RE = re.compile(r'\D+')
+    ADDRESS_RE = re.compile(r'\b(?:' + '|'.join(ADDRESS_WORDS) + r')\b', re.IGNORECASE)
+    ITEM_RE = re.compile(r'^(.+?)\s+' + AMOUNT_PATTERN + r'\s*$')
+    NUMERIC_DATE_RE, NAMED_DATE_RE = (re.compile(pattern, re.IGNORECASE) for pattern in DATE_PATTERNS)
+    # 'Sub total' and 'Sub-total' lines are subtotals, not totals
+    TOTAL_RE = _compile_keyword_amount(TOTAL_KEYWORDS, AMOUNT_PATTERN, prefix=r'(?<!sub[\s-])')
+    TAX_RE = _compile_keyword_amount(TAX_KEYWORDS, AMOUNT_PATTERN)
+    SUBTOTAL_RE = _compile_keyword_amount(SUBTOTAL_KEYWORDS, AMOUNT_PATTERN)
+    # Every amount keyword with its kind, so each line is classified in one pass
+    KEYWORD_TAGS = tuple(
+        [(keyword, 'total') for keyword in TOTAL_KEYWORDS]
+        + [(keyword, 'tax') for keyword in TAX_KEYWORDS]
+        + [(keyword, 'subtotal') for keyword in SUBTOTAL_KEYWORDS]
+    )
+    SUMMARY_TAGS = frozenset({'total', 'tax', 'subtotal'})
+    
+    def __init__(self):
+        self.backend = get_ocr_backend()
+        self.ocr_available = self.backend.is_available()
     
     def process_receipt(self, image_file) -> Dict[str, Any]:
         """
@@ -69,7 +132,84 @@ class ReceiptOCRService:
         Returns:
             Dictionary with extracted receipt data
         """
-        result = {
+        result = self._empty_result()
+        
+        try:
+            # Load and preprocess image
+            with span('receipt.preprocess'), self._open_image(image_file) as image:
+                processed_image = self._preprocess_image(image)
+            
+            # Extract text and parse it
+            with span('receipt.ocr'):
+                raw_text = self._extract_text(processed_image)
+            with span('receipt.parse'):
+                self._populate_result(result, raw_text)
+            
+        except Exception as e:
+            logger.error(f"Receipt processing failed: {e}")
+            result['error'] = str(e)
+        
+        return result
+    
+    def process_batch(self, image_files: List) -> List[Dict[str, Any]]:
+        """
+        Process several receipt images, handing the OCR backend one batch
+        of up to BATCH_SIZE preprocessed images at a time.
+        
+        Args:
+            image_files: Django files or file paths
+        
+        Returns:
+            One result dictionary per input, in the same order
+        """
+        if not self.ocr_available:
+            return [self.process_receipt(image_file) for image_file in image_files]
+        
+        results = []
+        for start in range(0, len(image_files), self.BATCH_SIZE):
+            results.extend(self._process_chunk(image_files[start:start + self.BATCH_SIZE]))
+        
+        return results
+    
+    def _process_chunk(self, image_files: List) -> List[Dict[str, Any]]:
+        """OCR up to BATCH_SIZE images in one backend call."""
+        results = [self._empty_result() for _ in image_files]
+        
+        queued = []
+        with span('receipt.preprocess', images=len(image_files)):
+            for index, image_file in enumerate(image_files):
+                try:
+                    with self._open_image(image_file) as image:
+                        queued.append((index, self._preprocess_image(image)))
+                except Exception as e:
+                    logger.error(f"Receipt processing failed: {e}")
+                    results[index]['error'] = str(e)
+        
+        if not queued:
+            return results
+        
+        try:
+            with span('receipt.ocr', images=len(queued)):
+                texts = self.backend.extract_batch([image for _, image in queued])
+        except Exception as e:
+            logger.error(f"Batch OCR failed: {e}")
+            for index, _ in queued:
+                results[index]['error'] = str(e)
+            return results
+        
+        with span('receipt.parse', images=len(queued)):
+            for (index, _), raw_text in zip(queued, texts):
+                try:
+                    self._populate_result(results[index], raw_text)
+                except Exception as e:
+                    logger.error(f"Receipt processing failed: {e}")
+                    results[index]['error'] = str(e)
+        
+        return results
+    
+    def _empty_result(self) -> Dict[str, Any]:
+        """Result skeleton returned when nothing could be extracted."""
+        return {
             'success': False,
             'raw_text': '',
             'merchant_name': '',
@@ -81,51 +221,63 @@ class ReceiptOCRService:
             'confidence': 0.0,
             'error': None
         }
+    
+    def _populate_result(self, result: Dict[str, Any], raw_text: str) -> Dict[str, Any]:
+        """Parse OCR text into the result dictionary."""
+        result['raw_text'] = raw_text
         
-        try:
-            # Load and preprocess image
-            image = self._load_image(image_file)
-            processed_image = self._preprocess_image(image)
-            
-            # Extract text
-            raw_text = self._extract_text(processed_image)
-            result['raw_text'] = raw_text
-            
-            if not raw_text.strip():
-                result['error'] = 'No text could be extracted from the image'
-                return result
-            
-            # Parse extracted text
-            parsed_data = self._parse_receipt_text(raw_text)
-            result.update(parsed_data)
-            result['success'] = True
-            result['confidence'] = self._calculate_confidence(result)
-            
-        except Exception as e:
-            logger.error(f"Receipt processing failed: {e}")
-            result['error'] = str(e)
+        if not raw_text.strip():
+            result['error'] = 'No text could be extracted from the image'
+            return result
+        
+        parsed_data = self._parse_receipt_text(raw_text)
+        result.update(parsed_data)
+        result['success'] = True
+        result['confidence'] = self._calculate_confidence(result)
         
         return result
     
-    def _load_image(self, image_file) -> Image.Image:
-        """Load image from various sources."""
-        if isinstance(image_file, str):
-            return Image.open(image_file)
-        elif hasattr(image_file, 'read'):
-            return Image.open(image_file)
-        else:
-            return Image.open(BytesIO(image_file))
+    @contextmanager
+    def _open_image(self, image_file) -> Iterator[Image.Image]:
+        """
+        Open an image from a path or file-like object for the length of a block.
+        
+        The file is handed to Pillow as-is rather than read into memory, so
+        only the header is parsed until the pixels are needed (and JPEGs can
+        still be draft-decoded). Files opened here, from a path or a Django
+        FieldFile, are closed when the block exits.
+        """
+        if isinstance(image_file, FieldFile):
+            image_file.open('rb')
+        
+        try:
+            with Image.open(image_file) as image:
+                # Reject oversized images before any pixels are decoded
+                if image.width * image.height > self.MAX_IMAGE_PIXELS:
+                    raise ValueError(
+                        f'Image is too large ({image.width}x{image.height} pixels)'
+                    )
+                
+                yield image
+        finally:
+            if isinstance(image_file, FieldFile):
+                image_file.close()
     
     def _preprocess_image(self, image: Image.Image) -> Image.Image:
         """
         Preprocess image for better OCR accuracy.
         
         Steps:
-        1. Convert to grayscale
-        2. Enhance contrast
-        3. Apply sharpening
-        4. Resize if too small
+        1. Decode JPEGs in grayscale at a reduced scale where possible
+        2. Convert to grayscale
+        3. Resize if too small
+        4. Enhance contrast and threshold in one lookup-table pass
+        5. Pack into a 1-bit bitmap, so Tesseract skips its own binarization
         """
+        # Lets libjpeg skip colour and subsample large photos while decoding;
+        # a no-op for other formats and for images that are already loaded
+        image.draft('L', self.OCR_DRAFT_SIZE)
+        
         # Convert to grayscale
         if image.mode != 'L':
             image = image.convert('L')
@@ -137,103 +289,83 @@ class ReceiptOCRService:
             new_size = (int(image.width * ratio), int(image.height * ratio))
             image = image.resize(new_size, Image.Resampling.LANCZOS)
         
-        # Enhance contrast
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(2.0)
+        # A writable copy of the pixels; the lookup below overwrites it in
+        # place instead of allocating a second full-size array
+        pixels = np.array(image)
         
-        # Sharpen
-        image = image.filter(ImageFilter.SHARPEN)
+        # Contrast x2 around the mean (as ImageEnhance.Contrast does) followed
+        # by a threshold at 150, fused into a 256-entry table so the full
+        # image is only traversed by a single indexed lookup
+        mean = int(pixels.mean() + 0.5)
+        contrasted = np.clip((self._GRAY_LEVELS - mean) * 2 + mean, 0, 255)
+        lut = np.where(contrasted > 150, 255, 0).astype(np.uint8)
         
-        # Apply threshold for cleaner text
-        threshold = 150
-        image = image.point(lambda p: 255 if p > threshold else 0)
+        np.take(lut, pixels, out=pixels)
         
-        return image
+        return Image.fromarray(pixels).convert('1', dither=Image.Dither.NONE)
     
     def _extract_text(self, image: Image.Image) -> str:
-        """Extract text from image using Tesseract."""
-        if not self.tesseract_available:
+        """Extract text from image using the configured OCR backend."""
+        if not self.ocr_available:
             return self._mock_extraction()
         
-        import pytesseract
-        
-        # Configure Tesseract for receipt-like documents
-        custom_config = r'--oem 3 --psm 6 -c preserve_interword_spaces=1'
-        
-        text = pytesseract.image_to_string(
-            image,
-            config=custom_config,
-            lang='eng'
-        )
-        
-        return text
+        return self.backend.extract_text(image)
     
     def _mock_extraction(self) -> str:
-        """Mock extraction for testing without Tesseract."""
-        return """
-        STARBUCKS COFFEE
-        123 MG Road, Bangalore
-        
-        Date: 15/01/2026
-        
-        Caffe Latte Grande     ₹285.00
-        Chocolate Muffin       ₹165.00
-        Bottled Water          ₹45.00
-        
-        Subtotal:              ₹495.00
-        CGST (2.5%):           ₹12.38
-        SGST (2.5%):           ₹12.38
-        
-        TOTAL:                 ₹519.76
-        
-        Thank you for visiting!
-        """
+        """Mock extraction for testing without an OCR engine."""
+        return _MOCK_RECEIPT_TEXT
     
     def _parse_receipt_text(self, text: str) -> Dict[str, Any]:
         """
         Parse raw OCR text to extract structured data.
         """
-        lines = text.strip().split('\n')
-        lines = [line.strip() for line in lines if line.strip()]
+        # Strip each line once; the keyword patterns ignore case, so the
+        # text is never lowercased as a whole
+        lines = [line for line in map(str.strip, text.split('\n')) if line]
+        line_tags = self._classify_lines(lines)
         
         result = {
             'merchant_name': self._extract_merchant_name(lines),
-            'items': self._extract_items(lines),
-            'subtotal': self._extract_amount(text, self.SUBTOTAL_KEYWORDS),
-            'tax_amount': self._extract_amount(text, self.TAX_KEYWORDS),
-            'total_amount': self._extract_amount(text, self.TOTAL_KEYWORDS),
+            'items': self._extract_items(lines, line_tags),
+            'subtotal': self._extract_amount(lines, line_tags, 'subtotal', self.SUBTOTAL_RE),
+            'tax_amount': self._extract_amount(lines, line_tags, 'tax', self.TAX_RE),
+            # Receipts print the final total last, after any running totals
+            'total_amount': self._extract_amount(lines, line_tags, 'total', self.TOTAL_RE, last=True),
             'receipt_date': self._extract_date(text),
         }
         
         return result
     
+    def _classify_lines(self, lines: List[str]) -> List[set]:
+        """Tag each line with the keyword kinds it contains."""
+        return [
+            {tag for keyword, tag in self.KEYWORD_TAGS if keyword in line}
+            for line in map(str.lower, lines)
+        ]
+    
     def _extract_merchant_name(self, lines: List[str]) -> str:
         """Extract merchant name (usually first non-empty line)."""
         for line in lines[:3]:  # Check first 3 lines
             # Skip lines that look like addresses or dates
-            if any(word in line.lower() for word in ['road', 'street', 'date', 'time', 'tel']):
+            if self.ADDRESS_RE.search(line):
                 continue
             # Skip lines with mostly numbers
-            if sum(c.isdigit() for c in line) > len(line) * 0.5:
+            if len(self.NON_DIGITS_RE.sub('', line)) > len(line) * 0.5:
                 continue
             if len(line) > 2:
                 return line
         return ''
     
-    def _extract_items(self, lines: List[str]) -> List[Dict[str, Any]]:
+    def _extract_items(self, lines: List[str], line_tags: List[set]) -> List[Dict[str, Any]]:
         """Extract individual line items with prices."""
         items = []
-        item_pattern = re.compile(
-            r'^(.+?)\s+' + self.AMOUNT_PATTERN + r'\s*$'
-        )
         
-        for line in lines:
+        for line, tags in zip(lines, line_tags):
             # Skip total/tax lines
-            if any(keyword in line.lower() for keyword in 
-                   self.TOTAL_KEYWORDS + self.TAX_KEYWORDS + self.SUBTOTAL_KEYWORDS):
+            if tags & self.SUMMARY_TAGS:
                 continue
             
-            match = item_pattern.match(line)
+            match = self.ITEM_RE.match(line)
             if match:
                 name = match.group(1).strip()
                 price_str = match.group(2).replace(',', '')
@@ -251,45 +383,73 @@ class ReceiptOCRService:
         
         return items
     
-    def _extract_amount(self, text: str, keywords: List[str]) -> Optional[float]:
-        """Extract amount associated with keywords (total, tax, etc.)."""
-        text_lower = text.lower()
-        
-        for keyword in keywords:
-            # Find the keyword and look for amount nearby
-            pattern = rf'{keyword}[:\s]*' + self.AMOUNT_PATTERN
-            match = re.search(pattern, text_lower)
-            
-            if match:
-                try:
-                    amount_str = match.group(1).replace(',', '')
-                    return float(amount_str)
-                except (ValueError, IndexError):
-                    continue
+    def _extract_amount(
+        self,
+        lines: List[str],
+        line_tags: List[set],
+        tag: str,
+        pattern: re.Pattern,
+        last: bool = False
+    ) -> Optional[float]:
+        """Extract the first (or last) amount following one of a group's keywords."""
+        # Only lines holding one of the keywords are searched, together with
+        # the two after each, which is as far as OCR wraps the amount
+        windows = [
+            '\n'.join(lines[index:index + 3])
+            for index, tags in enumerate(line_tags)
+            if tag in tags
+        ]
+        if last:
+            windows.reverse()
+        
+        for window in windows:
+            matches = list(pattern.finditer(window))
+            if matches:
+                match = matches[-1] if last else matches[0]
+                return float(match.group(1).replace(',', ''))
         
         return None
     
     def _extract_date(self, text: str) -> Optional[str]:
-        """Extract date from receipt text."""
-        for pattern in self.DATE_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                date_str = match.group(1)
-                # Try to parse and standardize
-                try:
-                    # Handle various formats
-                    for fmt in ['%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y',
-                               '%d %b %Y', '%d %B %Y']:
-                        try:
-                            date_obj = datetime.strptime(date_str, fmt)
-                            return date_obj.strftime('%Y-%m-%d')
-                        except ValueError:
-                            continue
-                except Exception:
-                    pass
-                return date_str
+        """
+        Extract date from receipt text.
+        
+        Dates are built from the captured day/month/year groups rather than
+        by trying strptime formats; text that doesn't form a valid date
+        (mixed separators, 3-digit years, 31/02) is returned as found.
+        """
+        match = self.NUMERIC_DATE_RE.search(text)
+        if match:
+            date_str, day, separator, month, other_separator, year = match.groups()
+            if separator == other_separator and len(year) != 3:
+                return self._format_date(day, int(month), year) or date_str
+            return date_str
+        
+        match = self.NAMED_DATE_RE.search(text)
+        if match:
+            date_str, day, month_name, year = match.groups()
+            month = self.MONTH_NUMBERS.get(month_name.lower())
+            if month and len(year) == 4:
+                return self._format_date(day, month, year) or date_str
+            return date_str
+        
         return None
     
+    def _format_date(self, day: str, month: int, year: str) -> Optional[str]:
+        """Validate date parts and format them as YYYY-MM-DD."""
+        year_number = int(year)
+        if len(year) == 2:
+            # Same century pivot as strptime's %y
+            year_number += 1900 if year_number >= 69 else 2000
+        day_number = int(day)
+        
+        if not (1 <= month <= 12 and year_number >= 1):
+            return None
+        if not 1 <= day_number <= calendar.monthrange(year_number, month)[1]:
+            return None
+        
+        return f'{year_number:04d}-{month:02d}-{day_number:02d}'
+    
     def _calculate_confidence(self, result: Dict[str, Any]) -> float:
         """Calculate confidence score based on extracted fields."""
         score = 0.0
@@ -308,13 +468,31 @@ class ReceiptOCRService:
         
         return min(score / max_score, 1.0)
     
-    def create_thumbnail(self, image_file, size=(300, 400)) -> BytesIO:
-        """Create a thumbnail for the receipt."""
-        image = self._load_image(image_file)
-        image.thumbnail(size, Image.Resampling.LANCZOS)
+    def create_thumbnail(self, image_file, size=(256, 256)) -> BytesIO:
+        """
+        Create a WebP thumbnail for the receipt.
         
-        thumb_io = BytesIO()
-        image.save(thumb_io, format='JPEG', quality=85)
-        thumb_io.seek(0)
+        WebP is typically several times smaller than the JPEG/PNG upload, so
+        list views can show receipts without fetching the original image.
+        """
+        with self._open_image(image_file) as image:
+            # Have libjpeg decode straight to RGB at no more than twice the
+            # thumbnail size; reducing_gap=3.0 keeps the box pre-reduction from
+            # visibly softening the LANCZOS result
+            image.draft('RGB', (size[0] * 2, size[1] * 2))
+            image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGB')
+            
+            # method=6 spends a little more encode time for smaller files
+            thumb_io = BytesIO()
+            image.save(thumb_io, format='WEBP', quality=75, method=6)
+            thumb_io.seek(0)
         
         return thumb_io
+
+
+@lru_cache(maxsize=1)
+def get_ocr_service() -> ReceiptOCRService:
+    """Shared service instance; it holds no per-receipt state."""
+    return ReceiptOCRService()
@@ -0,0 +1,144 @@
+"""
+Receipt processing pipeline.
+
+OCR runs for seconds per image, so uploads hand receipts to a small worker
+pool and return immediately; clients poll the receipt until its status
+leaves 'pending'/'processing'.
+
+The pool lives in the web process, so jobs queued or running when a worker
+restarts are lost and their receipts stay 'pending'/'processing'. Run
+`manage.py reprocess_all_receipts --status pending processing` after a
+restart to pick them up again.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List
+
+from django.core.files.base import File
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import Receipt, ReceiptItem
+from .ocr_service import ReceiptOCRService, get_ocr_service
+
+logger = logging.getLogger(__name__)
+
+# Shared worker pool. Tesseract runs outside the GIL but already uses up to
+# four threads per image, so one worker per four cores keeps CPUs busy
+# without oversubscribing them.
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 1) // 4),
+    thread_name_prefix='receipt-ocr'
+)
+
+
+def process_receipt(receipt: Receipt) -> None:
+    """Run OCR on a receipt and store the parsed fields, line items and thumbnail."""
+    receipt.status = 'processing'
+    receipt.save()
+    
+    try:
+        ocr_service = get_ocr_service()
+        result = ocr_service.process_receipt(receipt.image)
+        apply_ocr_result(receipt, result, ocr_service)
+    
+    except Exception as e:
+        receipt.status = 'failed'
+        receipt.error_message = str(e)
+        receipt.save()
+
+
+def process_receipts_batch(receipts: List[Receipt]) -> None:
+    """OCR several receipts through one batched Tesseract run per chunk."""
+    ocr_service = get_ocr_service()
+    results = ocr_service.process_batch([receipt.image for receipt in receipts])
+    
+    for receipt, result in zip(receipts, results):
+        try:
+            apply_ocr_result(receipt, result, ocr_service)
+        except Exception as e:
+            receipt.status = 'failed'
+            receipt.error_message = str(e)
+            receipt.save()
+
+
+def apply_ocr_result(receipt: Receipt, result: Dict[str, Any], ocr_service: ReceiptOCRService) -> None:
+    """Store an OCR result on the receipt, replacing earlier line items."""
+    if result['success']:
+        receipt.status = 'completed'
+        receipt.raw_text = result['raw_text']
+        receipt.merchant_name = result['merchant_name']
+        receipt.total_amount = result['total_amount']
+        receipt.subtotal = result['subtotal']
+        receipt.tax_amount = result['tax_amount']
+        receipt.items = result['items']
+        receipt.ai_confidence = result.get('confidence', 0.0)
+        
+        # Parse date
+        if result['receipt_date']:
+            try:
+                receipt.receipt_date = datetime.strptime(
+                    result['receipt_date'], '%Y-%m-%d'
+                ).date()
+            except ValueError:
+                pass
+        
+        # Pre-compute the list thumbnail while the upload is at hand
+        try:
+            thumbnail = ocr_service.create_thumbnail(receipt.image)
+            # Reprocessing replaces the old file instead of leaving it behind
+            receipt.thumbnail.delete(save=False)
+            receipt.thumbnail.save(
+                f"receipt_{receipt.pk}.webp",
+                File(thumbnail),
+                save=False
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("Could not create thumbnail for receipt %s: %s", receipt.pk, e)
+    
+    else:
+        receipt.status = 'failed'
+        receipt.error_message = result.get('error', 'OCR processing failed')
+    
+    receipt.processed_at = timezone.now()
+    
+    # Save the receipt and replace its line items in one transaction
+    with transaction.atomic():
+        receipt.save()
+        
+        if result['success']:
+            receipt.line_items.all().delete()
+            ReceiptItem.objects.bulk_create(
+                [
+                    ReceiptItem(
+                        receipt=receipt,
+                        name=item_data['name'],
+                        quantity=item_data.get('quantity', 1),
+                        unit_price=item_data['price'],
+                        total_price=item_data['price'] * item_data.get('quantity', 1)
+                    )
+                    for item_data in result['items']
+                ],
+                batch_size=100
+            )
+
+
+def _process_in_background(receipt_id: int) -> None:
+    """Worker-thread entry point; releases its DB connection when done."""
+    try:
+        receipt = Receipt.objects.filter(pk=receipt_id).first()
+        if receipt is not None:
+            process_receipt(receipt)
+    except Exception:
+        logger.exception("Background processing failed for receipt %s", receipt_id)
+    finally:
+        connection.close()
+
+
+def enqueue_receipt_processing(receipt: Receipt) -> None:
+    """Process a receipt off the request thread once its row is committed."""
+    receipt_id = receipt.pk
+    transaction.on_commit(lambda: _executor.submit(_process_in_background, receipt_id))
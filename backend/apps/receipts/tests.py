@@ -0,0 +1,194 @@
+"""
+Tests for the receipt upload and the status endpoint clients poll afterwards.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .models import Receipt
+from .services.ocr_service import _MOCK_RECEIPT_TEXT, ReceiptOCRService
+from .services.processing import apply_ocr_result, process_receipt
+
+
+class ReceiptStatusTests(TestCase):
+    
+    def setUp(self):
+        self.client = APIClient()
+    
+    def status(self, receipt_id):
+        return self.client.get(f'/api/receipts/{receipt_id}/status/')
+    
+    def test_pending_receipt(self):
+        receipt = Receipt.objects.create(image='receipts/pending.png')
+        
+        with self.assertNumQueries(1):
+            response = self.status(receipt.pk)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'id': receipt.pk,
+            'status': 'pending',
+            'error_message': '',
+            'processed_at': None,
+        })
+    
+    def test_failed_receipt_reports_error(self):
+        processed_at = timezone.now()
+        receipt = Receipt.objects.create(
+            image='receipts/failed.png', status='failed',
+            error_message='OCR processing failed', processed_at=processed_at
+        )
+        
+        data = self.status(receipt.pk).data
+        
+        self.assertEqual(data['status'], 'failed')
+        self.assertEqual(data['error_message'], 'OCR processing failed')
+        self.assertEqual(data['processed_at'], processed_at)
+    
+    def test_unknown_receipt(self):
+        self.assertEqual(self.status(999).status_code, 404)
+
+
+class ReceiptUploadTests(TestCase):
+    
+    def setUp(self):
+        self.client = APIClient()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+    
+    def image(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), 'white').save(buffer, format='PNG')
+        return SimpleUploadedFile('receipt.png', buffer.getvalue(), content_type='image/png')
+    
+    @mock.patch('apps.receipts.views.enqueue_receipt_processing')
+    def test_upload_is_accepted_and_pollable(self, enqueue):
+        response = self.client.post('/api/receipts/', {'image': self.image()}, format='multipart')
+        
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        receipt = Receipt.objects.get(pk=response.data['id'])
+        enqueue.assert_called_once_with(receipt)
+        
+        status = self.client.get(f'/api/receipts/{receipt.pk}/status/').data
+        self.assertEqual(status['status'], 'pending')
+
+
+class ApplyOcrResultTests(TestCase):
+    
+    RESULT = {
+        'success': True, 'raw_text': 'TOTAL 100.00', 'merchant_name': 'Cafe',
+        'total_amount': 100.0, 'subtotal': None, 'tax_amount': None,
+        'items': [], 'receipt_date': '2026-03-05',
+    }
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), 'white').save(buffer, format='PNG')
+        self.receipt = Receipt.objects.create(
+            image=SimpleUploadedFile('receipt.png', buffer.getvalue())
+        )
+    
+    def ocr_service(self):
+        service = mock.Mock()
+        service.create_thumbnail.side_effect = lambda image: io.BytesIO(b'thumbnail')
+        return service
+    
+    def test_reprocessing_replaces_thumbnail(self):
+        apply_ocr_result(self.receipt, self.RESULT, self.ocr_service())
+        apply_ocr_result(self.receipt, self.RESULT, self.ocr_service())
+        
+        thumbnails = os.listdir(os.path.join(self.media_root, 'receipts', 'thumbnails'))
+        self.assertEqual(thumbnails, [os.path.basename(self.receipt.thumbnail.name)])
+    
+    def test_receipt_date_is_parsed(self):
+        apply_ocr_result(self.receipt, self.RESULT, self.ocr_service())
+        
+        self.assertEqual(self.receipt.receipt_date, date(2026, 3, 5))
+    
+    def test_thumbnail_failure_is_logged(self):
+        service = self.ocr_service()
+        service.create_thumbnail.side_effect = OSError('cannot identify image file')
+        
+        with self.assertLogs('apps.receipts.services.processing', 'WARNING'):
+            apply_ocr_result(self.receipt, self.RESULT, service)
+        
+        self.assertEqual(self.receipt.status, 'completed')
+        self.assertFalse(self.receipt.thumbnail)
+
+    
+    def test_processing_closes_image_and_makes_thumbnail(self):
+        # The sample receipt, whether or not Tesseract is installed
+        with mock.patch.object(ReceiptOCRService, '_extract_text', return_value=_MOCK_RECEIPT_TEXT):
+            process_receipt(self.receipt)
+        
+        self.assertEqual(self.receipt.status, 'completed')
+        self.assertTrue(self.receipt.image.closed)
+        self.assertTrue(self.receipt.thumbnail)
+
+
+class ReceiptParserTests(SimpleTestCase):
+    
+    def setUp(self):
+        self.service = ReceiptOCRService()
+    
+    def parse(self, text):
+        return self.service._parse_receipt_text(text)
+    
+    def test_summary_lines_are_not_items(self):
+        result = self.parse(_MOCK_RECEIPT_TEXT)
+        
+        self.assertEqual(
+            [(item['name'], item['price']) for item in result['items']],
+            [('Caffe Latte Grande', 285.0), ('Chocolate Muffin', 165.0), ('Bottled Water', 45.0)]
+        )
+        self.assertEqual(result['merchant_name'], 'STARBUCKS COFFEE')
+        self.assertEqual(result['subtotal'], 495.0)
+        self.assertEqual(result['total_amount'], 519.76)
+    
+    def test_two_digit_year_pivots_like_strptime(self):
+        self.assertEqual(self.service._extract_date('Date: 05/03/26'), '2026-03-05')
+        self.assertEqual(self.service._extract_date('Date: 05/03/68'), '2068-03-05')
+        self.assertEqual(self.service._extract_date('Date: 05/03/69'), '1969-03-05')
+    
+    def test_mixed_separators_are_returned_as_found(self):
+        self.assertEqual(self.service._extract_date('Date: 05-03/2026'), '05-03/2026')
+    
+    def test_invalid_day_is_returned_as_found(self):
+        self.assertEqual(self.service._extract_date('Date: 31/02/2026'), '31/02/2026')
+        self.assertEqual(self.service._extract_date('Date: 29/02/2024'), '2024-02-29')
+    
+    def test_named_months(self):
+        self.assertEqual(self.service._extract_date('5 Mar 2026'), '2026-03-05')
+        self.assertEqual(self.service._extract_date('5 march 2026'), '2026-03-05')
+        self.assertEqual(self.service._extract_date('5 Mar 26'), '5 Mar 26')
+    
+    def test_sub_total_is_not_the_total(self):
+        result = self.parse('Sub total 100.00\nSub-total 100.00\nTotal 118.00')
+        
+        self.assertEqual(result['subtotal'], 100.0)
+        self.assertEqual(result['total_amount'], 118.0)
+    
+    def test_last_total_wins(self):
+        result = self.parse('Total 50.00\nTip 5.00\nGrand Total 55.00')
+        
+        self.assertEqual(result['total_amount'], 55.0)
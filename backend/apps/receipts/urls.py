@@ -2,13 +2,11 @@
 URL configuration for receipts app.
 """
 
-from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ReceiptViewSet
 
 router = DefaultRouter()
 router.register(r'', ReceiptViewSet, basename='receipt')
 
-urlpatterns = [
-    path('', include(router.urls)),
-]
+# The router's own patterns, without an extra include() level to resolve through
+urlpatterns = router.urls
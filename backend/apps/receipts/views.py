@@ -6,13 +6,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.contrib.auth import get_user_model
 from django.utils import timezone
 
-from .models import Receipt, ReceiptItem
+from apps.transactions.models import Transaction, Category
+from apps.transactions.serializers import TransactionSerializer
+from .models import Receipt
 from .serializers import (
-    ReceiptSerializer, ReceiptUploadSerializer, ReceiptToTransactionSerializer
+    ReceiptSerializer, ReceiptListSerializer, ReceiptUploadSerializer,
+    ReceiptToTransactionSerializer
 )
-from .services.ocr_service import ReceiptOCRService
+from .services.processing import enqueue_receipt_processing, process_receipt
 
 
 class ReceiptViewSet(viewsets.ModelViewSet):
@@ -23,17 +27,31 @@ class ReceiptViewSet(viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, FormParser]
     
     def get_queryset(self):
-        return Receipt.objects.all()
+        if self.action == 'processing_status':
+            return Receipt.objects.only('id', 'status', 'error_message', 'processed_at')
+        if self.action == 'list':
+            return ReceiptListSerializer.setup_eager_loading(Receipt.objects.all())
+        return ReceiptSerializer.setup_eager_loading(Receipt.objects.all())
     
     def get_serializer_class(self):
         if self.action == 'create':
             return ReceiptUploadSerializer
+        if self.action == 'list':
+            return ReceiptListSerializer
         return ReceiptSerializer
     
+    def create(self, request, *args, **kwargs):
+        """Accept an upload and return the pending receipt for polling."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        
+        data = ReceiptSerializer(serializer.instance, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+    
     def perform_create(self, serializer):
         """Upload and process receipt."""
         # Single User Mode: Assign to default user
-        from django.contrib.auth import get_user_model
         User = get_user_model()
         user = User.objects.first()
         if not user:
@@ -41,65 +59,25 @@ class ReceiptViewSet(viewsets.ModelViewSet):
         
         receipt = serializer.save(user=user)
         
-        # Process receipt with OCR
-        self._process_receipt(receipt)
+        # OCR is slow; process in the background and let the client poll
+        enqueue_receipt_processing(receipt)
     
-    def _process_receipt(self, receipt: Receipt):
-        """Process receipt with OCR service."""
-        receipt.status = 'processing'
-        receipt.save()
-        
-        try:
-            ocr_service = ReceiptOCRService()
-            result = ocr_service.process_receipt(receipt.image)
-            
-            if result['success']:
-                receipt.status = 'completed'
-                receipt.raw_text = result['raw_text']
-                receipt.merchant_name = result['merchant_name']
-                receipt.total_amount = result['total_amount']
-                receipt.subtotal = result['subtotal']
-                receipt.tax_amount = result['tax_amount']
-                receipt.items = result['items']
-                receipt.ai_confidence = result.get('confidence', 0.0)
-                
-                # Parse date
-                if result['receipt_date']:
-                    from datetime import datetime
-                    try:
-                        receipt.receipt_date = datetime.strptime(
-                            result['receipt_date'], '%Y-%m-%d'
-                        ).date()
-                    except ValueError:
-                        pass
-                
-                # Create line items
-                for item_data in result['items']:
-                    ReceiptItem.objects.create(
-                        receipt=receipt,
-                        name=item_data['name'],
-                        quantity=item_data.get('quantity', 1),
-                        unit_price=item_data['price'],
-                        total_price=item_data['price'] * item_data.get('quantity', 1)
-                    )
-                
-            else:
-                receipt.status = 'failed'
-                receipt.error_message = result.get('error', 'OCR processing failed')
-            
-            receipt.processed_at = timezone.now()
-            receipt.save()
-            
-        except Exception as e:
-            receipt.status = 'failed'
-            receipt.error_message = str(e)
-            receipt.save()
+    @action(detail=True, methods=['get'], url_path='status')
+    def processing_status(self, request, pk=None):
+        """Lightweight processing status for clients polling after upload."""
+        receipt = self.get_object()
+        return Response({
+            'id': receipt.id,
+            'status': receipt.status,
+            'error_message': receipt.error_message,
+            'processed_at': receipt.processed_at,
+        })
     
     @action(detail=True, methods=['post'])
     def reprocess(self, request, pk=None):
         """Re-run OCR processing on a receipt."""
         receipt = self.get_object()
-        self._process_receipt(receipt)
+        process_receipt(receipt)
         
         serializer = self.get_serializer(receipt)
         return Response(serializer.data)
@@ -118,8 +96,6 @@ class ReceiptViewSet(viewsets.ModelViewSet):
         serializer = ReceiptToTransactionSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        from apps.transactions.models import Transaction, Category
-        
         # Get category
         category = None
         if serializer.validated_data.get('category_id'):
@@ -143,11 +119,10 @@ class ReceiptViewSet(viewsets.ModelViewSet):
             category=category,
             source='receipt',
             receipt=receipt,
-            date=serializer.validated_data.get('date') or receipt.receipt_date or timezone.now().date(),
+            date=serializer.validated_data.get('date') or receipt.receipt_date or timezone.localdate(),
             notes=serializer.validated_data.get('notes', ''),
         )
         
-        from apps.transactions.serializers import TransactionSerializer
         return Response(
             TransactionSerializer(transaction).data,
             status=status.HTTP_201_CREATED
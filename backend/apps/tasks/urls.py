@@ -1,10 +1,8 @@
-from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import TaskViewSet
 
 router = DefaultRouter()
 router.register(r'', TaskViewSet, basename='task')
 
-urlpatterns = [
-    path('', include(router.urls)),
-]
+# The router's own patterns, without an extra include() level to resolve through
+urlpatterns = router.urls
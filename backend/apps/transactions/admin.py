@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Transaction, Budget
+from .models import Category, Transaction, Budget, MonthlySummary
 
 
 @admin.register(Category)
@@ -12,6 +12,7 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ['amount', 'description', 'category', 'transaction_type', 'date', 'source']
+    list_select_related = ['category']
     list_filter = ['transaction_type', 'source', 'date']
     search_fields = ['description', 'merchant']
     date_hierarchy = 'date'
@@ -21,4 +22,11 @@ class TransactionAdmin(admin.ModelAdmin):
 @admin.register(Budget)
 class BudgetAdmin(admin.ModelAdmin):
     list_display = ['category', 'amount', 'period', 'is_active']
+    list_select_related = ['category']
     list_filter = ['period', 'is_active']
+
+
+@admin.register(MonthlySummary)
+class MonthlySummaryAdmin(admin.ModelAdmin):
+    list_display = ['month', 'total_spent', 'total_income', 'transaction_count', 'updated_at']
+    ordering = ['-month']
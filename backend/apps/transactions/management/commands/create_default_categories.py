@@ -3,6 +3,7 @@ Management command to create default categories.
 """
 
 from django.core.management.base import BaseCommand
+from apps.analytics.cache import bump_version
 from apps.transactions.models import Category
 
 
@@ -56,26 +57,34 @@ class Command(BaseCommand):
     ]
     
     def handle(self, *args, **options):
-        created_count = 0
+        # One query for what exists and one insert for the rest
+        existing_icons = dict(
+            Category.objects.filter(
+                name__in=[cat_data['name'] for cat_data in self.DEFAULT_CATEGORIES]
+            ).values_list('name', 'icon')
+        )
         
-        for cat_data in self.DEFAULT_CATEGORIES:
-            category, created = Category.objects.get_or_create(
+        new_categories = [
+            Category(
                 name=cat_data['name'],
-                user=None,  # Default categories have no user
-                defaults={
-                    'icon': cat_data['icon'],
-                    'color': cat_data['color'],
-                    'is_income': cat_data['is_income'],
-                    'keywords': cat_data['keywords']
-                }
+                icon=cat_data['icon'],
+                color=cat_data['color'],
+                is_income=cat_data['is_income'],
             )
-            
-            if created:
-                created_count += 1
-                self.stdout.write(f"  Created: {category.icon} {category.name}")
+            for cat_data in self.DEFAULT_CATEGORIES
+            if cat_data['name'] not in existing_icons
+        ]
+        Category.objects.bulk_create(new_categories)
+        if new_categories:
+            # bulk_create skips the post_save signal that invalidates analytics
+            bump_version()
+        
+        for cat_data in self.DEFAULT_CATEGORIES:
+            if cat_data['name'] in existing_icons:
+                self.stdout.write(f"  Exists: {existing_icons[cat_data['name']]} {cat_data['name']}")
             else:
-                self.stdout.write(f"  Exists: {category.icon} {category.name}")
+                self.stdout.write(f"  Created: {cat_data['icon']} {cat_data['name']}")
         
         self.stdout.write(
-            self.style.SUCCESS(f'\nCreated {created_count} new categories')
+            self.style.SUCCESS(f'\nCreated {len(new_categories)} new categories')
         )
@@ -0,0 +1,20 @@
+"""
+Management command to rebuild the pre-aggregated monthly summaries.
+
+Signals keep the table current for individual saves and deletes; run this
+nightly (e.g. from cron) to pick up bulk writes that bypass them.
+"""
+
+from django.core.management.base import BaseCommand
+from apps.transactions.models import MonthlySummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the monthly_summaries table from transactions'
+
+    def handle(self, *args, **kwargs):
+        refreshed = MonthlySummary.rebuild_all()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Refreshed {refreshed} monthly summaries')
+        )
@@ -3,6 +3,8 @@ Management command to seed default categories.
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.analytics.cache import bump_version
 from apps.transactions.models import Category
 
 
@@ -28,36 +30,47 @@ class Command(BaseCommand):
     ]
 
     def handle(self, *args, **kwargs):
+        categories_by_name = {cat_data['name']: cat_data for cat_data in self.CATEGORIES}
+
+        # Both writes in one commit
+        with transaction.atomic():
+            # Refresh existing categories in one UPDATE batch
+            existing = list(Category.objects.filter(name__in=categories_by_name))
+            for category in existing:
+                cat_data = categories_by_name[category.name]
+                category.icon = cat_data['icon']
+                category.color = cat_data['color']
+                category.is_income = cat_data.get('is_income', False)
+            Category.objects.bulk_update(existing, ['icon', 'color', 'is_income'])
+
+            # ...and create the missing ones in one INSERT
+            existing_names = {category.name for category in existing}
+            Category.objects.bulk_create([
+                Category(
+                    name=cat_data['name'],
+                    icon=cat_data['icon'],
+                    color=cat_data['color'],
+                    is_income=cat_data.get('is_income', False),
+                )
+                for cat_data in self.CATEGORIES
+                if cat_data['name'] not in existing_names
+            ])
+
+        # Bulk writes skip the post_save signal that invalidates analytics
+        bump_version()
+
         created_count = 0
         updated_count = 0
-
         for cat_data in self.CATEGORIES:
-            category, created = Category.objects.get_or_create(
-                name=cat_data['name'],
-                user=None,  # Default categories have no user
-                defaults={
-                    'icon': cat_data['icon'],
-                    'color': cat_data['color'],
-                    'keywords': cat_data.get('keywords', []),
-                    'is_income': cat_data.get('is_income', False),
-                }
-            )
-            
-            if created:
-                created_count += 1
+            if cat_data['name'] in existing_names:
+                updated_count += 1
                 self.stdout.write(
-                    self.style.SUCCESS(f'✓ Created category: {category.name} {category.icon}')
+                    self.style.WARNING(f'↻ Updated category: {cat_data["name"]} {cat_data["icon"]}')
                 )
             else:
-                # Update existing category
-                category.icon = cat_data['icon']
-                category.color = cat_data['color']
-                category.keywords = cat_data.get('keywords', [])
-                category.is_income = cat_data.get('is_income', False)
-                category.save()
-                updated_count += 1
+                created_count += 1
                 self.stdout.write(
-                    self.style.WARNING(f'↻ Updated category: {category.name} {category.icon}')
+                    self.style.SUCCESS(f'✓ Created category: {cat_data["name"]} {cat_data["icon"]}')
                 )
 
         self.stdout.write(
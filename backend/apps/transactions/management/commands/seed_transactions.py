@@ -3,11 +3,13 @@ Management command to seed sample transactions for testing.
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
 from django.utils import timezone
-from datetime import timedelta
 from decimal import Decimal
-import random
-from apps.transactions.models import Transaction, Category
+import os
+import numpy as np
+from apps.analytics.cache import bump_version
+from apps.transactions.models import Transaction, Category, MonthlySummary
 from apps.users.models import User
 
 
@@ -56,6 +58,14 @@ class Command(BaseCommand):
         ("Spa Treatment", "Spa", "Personal Care", 1000, 2500),
     ]
 
+    # The samples column by column, so sampled indices select from each directly
+    DESCRIPTIONS, MERCHANTS, CATEGORY_NAMES, MIN_AMOUNTS, MAX_AMOUNTS = zip(*SAMPLE_TRANSACTIONS)
+    MIN_AMOUNTS = np.array(MIN_AMOUNTS)
+    MAX_AMOUNTS = np.array(MAX_AMOUNTS)
+
+    # Rows per INSERT statement
+    BATCH_SIZE = int(os.getenv('SEED_BATCH_SIZE', 500))
+
     def handle(self, *args, **kwargs):
         # Get or create a user
         user = User.objects.first()
@@ -65,46 +75,62 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f'Creating transactions for user: {user.email}'))
 
-        # Generate transactions for the last 6 months
-        created_count = 0
-        today = timezone.now().date()
+        # Look categories up once instead of per transaction
+        categories = {
+            category.name: category
+            for category in Category.objects.filter(
+                name__in=set(self.CATEGORY_NAMES)
+            )
+        }
+
+        # Generate transactions for the last 6 months, drawing every random
+        # value up front in a few vectorized calls
+        rng = np.random.default_rng()
+        today = timezone.localdate()
+        
+        # 10-20 transactions per month
+        per_month = rng.integers(10, 21, size=6)
+        month_offsets = np.repeat(np.arange(6), per_month)
+        total = int(per_month.sum())
         
-        for month_offset in range(6):
-            # Generate 10-20 transactions per month
-            num_transactions = random.randint(10, 20)
-            
-            for _ in range(num_transactions):
-                # Random transaction from our sample list
-                desc, merchant, cat_name, min_amt, max_amt = random.choice(self.SAMPLE_TRANSACTIONS)
-                
-                # Random day in the month
-                days_back = (month_offset * 30) + random.randint(0, 29)
-                transaction_date = today - timedelta(days=days_back)
-                
-                # Random amount in the range
-                amount = Decimal(random.randint(min_amt, max_amt))
-                
-                # Get category
-                category = Category.objects.filter(name=cat_name, user=None).first()
-                if not category:
-                    continue
-                
-                # Create transaction
-                Transaction.objects.create(
-                    user=user,
-                    description=desc,
-                    merchant=merchant,
-                    amount=amount,
-                    transaction_type='expense',
-                    category=category,
-                    date=transaction_date,
-                    source='seed',
-                    ai_categorized=False,
-                )
-                created_count += 1
+        # Random transaction from our sample list, dropping samples whose
+        # category hasn't been seeded before anything else is drawn for them
+        picks = rng.integers(0, len(self.SAMPLE_TRANSACTIONS), size=total)
+        seeded = np.array([name in categories for name in self.CATEGORY_NAMES])
+        keep = seeded[picks]
+        picks, month_offsets = picks[keep], month_offsets[keep]
+        total = len(picks)
+        
+        # Random amount in each pick's range
+        amounts = rng.integers(self.MIN_AMOUNTS[picks], self.MAX_AMOUNTS[picks] + 1)
+        # Whole-rupee amounts, converted in one pass before building rows
+        amounts = list(map(Decimal, amounts.tolist()))
+        
+        # Random day in the month
+        days_back = month_offsets * 30 + rng.integers(0, 30, size=total)
+        dates = (np.datetime64(today, 'D') - days_back.astype('timedelta64[D]')).tolist()
+        
+        transactions = []
+        for pick, amount, date in zip(picks.tolist(), amounts, dates):
+            transactions.append(Transaction(
+                description=self.DESCRIPTIONS[pick],
+                merchant=self.MERCHANTS[pick],
+                amount=amount,
+                transaction_type='expense',
+                category=categories[self.CATEGORY_NAMES[pick]],
+                date=date,
+                source='seed',
+            ))
+
+        # Multi-row INSERTs in a single commit
+        with db_transaction.atomic():
+            Transaction.objects.bulk_create(transactions, batch_size=self.BATCH_SIZE)
+            # bulk_create skips the signals that maintain these
+            MonthlySummary.rebuild_all()
+        bump_version()
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'✅ Successfully created {created_count} sample transactions over 6 months'
+                f'✅ Successfully created {len(transactions)} sample transactions over 6 months'
             )
         )
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0002_remove_category_keywords_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["transaction_type", "date"],
+                name="transaction_transac_d48df4_idx",
+            ),
+        ),
+    ]
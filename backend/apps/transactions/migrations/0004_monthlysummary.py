@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_transaction_transaction_transac_d48df4_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "month",
+                    models.DateField(help_text="First day of the month", unique=True),
+                ),
+                (
+                    "total_spent",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "total_income",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("transaction_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Monthly summaries",
+                "db_table": "monthly_summaries",
+                "ordering": ["-month"],
+            },
+        ),
+    ]
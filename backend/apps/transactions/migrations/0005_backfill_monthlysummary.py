@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_summaries(apps, schema_editor):
+    Transaction = apps.get_model("transactions", "Transaction")
+    MonthlySummary = apps.get_model("transactions", "MonthlySummary")
+
+    rows = (
+        Transaction.objects.annotate(month=TruncMonth("date"))
+        .values("month")
+        .annotate(
+            total_spent=Sum("amount", filter=Q(transaction_type="expense")),
+            total_income=Sum("amount", filter=Q(transaction_type="income")),
+            transaction_count=Count("id"),
+        )
+        .order_by()
+    )
+    MonthlySummary.objects.bulk_create(
+        [
+            MonthlySummary(
+                month=row["month"],
+                total_spent=row["total_spent"] or 0,
+                total_income=row["total_income"] or 0,
+                transaction_count=row["transaction_count"],
+            )
+            for row in rows
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0004_monthlysummary"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_monthly_summaries, migrations.RunPython.noop),
+    ]
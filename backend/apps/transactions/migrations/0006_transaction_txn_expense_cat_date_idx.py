@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0005_backfill_monthlysummary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("transaction_type", "expense")),
+                fields=["category", "date"],
+                name="txn_expense_cat_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0006_transaction_txn_expense_cat_date_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_date_7edf95_idx",
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["-date", "-created_at"], name="txn_date_created_idx"
+            ),
+        ),
+    ]
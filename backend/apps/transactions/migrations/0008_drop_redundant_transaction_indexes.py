@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:23
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0007_transaction_date_created_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_categor_bf503b_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_transac_ddda52_idx",
+        ),
+    ]
@@ -2,7 +2,11 @@
 Transaction and Category models for expense tracking.
 """
 
-from django.db import models
+from datetime import date
+
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
 
 
 class Category(models.Model):
@@ -78,13 +82,28 @@ class Transaction(models.Model):
         db_table = 'transactions'
         ordering = ['-date', '-created_at']
         indexes = [
-            models.Index(fields=['date']),
-            models.Index(fields=['category']),
-            models.Index(fields=['transaction_type']),
+            # Default list ordering; also serves plain date-range filters
+            models.Index(fields=['-date', '-created_at'], name='txn_date_created_idx'),
+            # Date-range scans of one type, as in the analytics expense queries
+            models.Index(fields=['transaction_type', 'date']),
+            # Per-category expense history (category forecasts, budget spend)
+            models.Index(
+                fields=['category', 'date'],
+                condition=Q(transaction_type='expense'),
+                name='txn_expense_cat_date_idx'
+            ),
         ]
     
     def __str__(self):
         return f"{self.transaction_type}: {self.amount} - {self.description[:30]}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Stored date, so a save that moves the transaction to another month
+        # can refresh both summaries without re-reading the row (signals.py)
+        instance._loaded_date = instance.__dict__.get('date')
+        return instance
 
 
 class Budget(models.Model):
@@ -118,3 +137,84 @@ class Budget(models.Model):
     
     def __str__(self):
         return f"{self.category.name}: {self.amount}/{self.period}"
+
+
+class MonthlySummary(models.Model):
+    """
+    Pre-aggregated totals for one calendar month.
+    
+    Kept in sync by the Transaction signal handlers so the dashboard can read
+    a single row instead of aggregating the month on every request.
+    """
+    
+    month = models.DateField(unique=True, help_text="First day of the month")
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'monthly_summaries'
+        verbose_name_plural = 'Monthly summaries'
+        ordering = ['-month']
+    
+    def __str__(self):
+        return f"{self.month:%Y-%m}: spent {self.total_spent}, income {self.total_income}"
+    
+    @classmethod
+    def for_month(cls, month: date) -> 'MonthlySummary':
+        """
+        Stored summary for the month containing `month`, without writing.
+        
+        Months without transactions have no row; an unsaved, all-zero
+        summary is returned for them.
+        """
+        month_start = month.replace(day=1)
+        return cls.objects.filter(month=month_start).first() or cls(month=month_start)
+    
+    @classmethod
+    def refresh(cls, month: date) -> 'MonthlySummary':
+        """Recompute and store the summary for the month containing `month`."""
+        month_start = cls._meta.get_field('month').to_python(month).replace(day=1)
+        if month_start.month == 12:
+            next_month = month_start.replace(year=month_start.year + 1, month=1)
+        else:
+            next_month = month_start.replace(month=month_start.month + 1)
+        
+        with transaction.atomic():
+            # Lock the row before aggregating, so concurrent refreshes of a
+            # month run one after the other and the last one sees every
+            # committed write; get_or_create retries the lookup if another
+            # refresh inserts the month first
+            summary, _ = cls.objects.select_for_update().get_or_create(month=month_start)
+            
+            totals = Transaction.objects.filter(
+                date__gte=month_start,
+                date__lt=next_month
+            ).aggregate(
+                total_spent=Sum('amount', filter=Q(transaction_type='expense')),
+                total_income=Sum('amount', filter=Q(transaction_type='income')),
+                transaction_count=Count('id')
+            )
+            
+            summary.total_spent = totals['total_spent'] or 0
+            summary.total_income = totals['total_income'] or 0
+            summary.transaction_count = totals['transaction_count']
+            summary.save(update_fields=[
+                'total_spent', 'total_income', 'transaction_count', 'updated_at'
+            ])
+        return summary
+    
+    @classmethod
+    def rebuild_all(cls) -> int:
+        """Recompute every month that has transactions and drop empty ones."""
+        months = set(
+            Transaction.objects.annotate(
+                month=TruncMonth('date')
+            ).values_list('month', flat=True).distinct()
+        )
+        cls.objects.exclude(month__in=months).delete()
+        for month in months:
+            cls.refresh(month)
+        return len(months)
@@ -2,7 +2,14 @@
 Serializers for Transaction management.
 """
 
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from rest_framework import serializers
+
 from .models import Category, Transaction, Budget
 
 
@@ -21,19 +28,34 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_transaction_count(self, obj):
+        # Annotated by CategoryViewSet.get_queryset; freshly created
+        # categories fall back to a query
+        if hasattr(obj, '_transaction_count'):
+            return obj._transaction_count
         return obj.transactions.count()
     
     def get_total_spent(self, obj):
-        from django.db.models import Sum
-        total = obj.transactions.aggregate(total=Sum('amount'))['total']
+        if hasattr(obj, '_total_spent'):
+            total = obj._total_spent
+        else:
+            total = obj.transactions.aggregate(total=Sum('amount'))['total']
         return float(total) if total else 0
 
 
+class CategoryListSerializer(serializers.ModelSerializer):
+    """Slim serializer for category lists and pickers, without per-category stats."""
+    
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'icon', 'color', 'is_income']
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     """Serializer for transactions."""
     
-    category_name = serializers.SerializerMethodField()
-    category_icon = serializers.SerializerMethodField()
+    # Read through the select_related category; '' when uncategorized
+    category_name = serializers.CharField(source='category.name', read_only=True, default='')
+    category_icon = serializers.CharField(source='category.icon', read_only=True, default='')
     
     class Meta:
         model = Transaction
@@ -45,12 +67,6 @@ class TransactionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'source', 'created_at', 'updated_at']
     
-    def get_category_name(self, obj):
-        return obj.category.name if obj.category else ''
-    
-    def get_category_icon(self, obj):
-        return obj.category.icon if obj.category else ''
-    
     def create(self, validated_data):
         validated_data['source'] = 'manual'
         return super().create(validated_data)
@@ -88,26 +104,42 @@ class BudgetSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_spent(self, obj):
-        from django.db.models import Sum
-        from django.utils import timezone
-        from datetime import timedelta
+        # Kept on the budget, since get_percentage_used needs it as well
+        if not hasattr(obj, '_spent'):
+            period = obj.period if obj.period in ('weekly', 'monthly') else 'yearly'
+            spent = self._spent_by_category().get(obj.category_id)
+            obj._spent = float(spent[period]) if spent else 0
         
-        now = timezone.now()
+        return obj._spent
+    
+    def _spent_by_category(self):
+        """
+        Expense totals per category for every budget period.
+        
+        Computed with one grouped query and kept in the serializer context,
+        which a list's child serializers share, so listing M budgets costs
+        one query instead of 2M.
+        """
+        if 'spent_by_category' in self.context:
+            return self.context['spent_by_category']
         
-        if obj.period == 'weekly':
-            start_date = now - timedelta(days=now.weekday())
-        elif obj.period == 'monthly':
-            start_date = now.replace(day=1)
-        else:  # yearly
-            start_date = now.replace(month=1, day=1)
+        today = timezone.localdate()
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+        year_start = today.replace(month=1, day=1)
         
-        total = Transaction.objects.filter(
-            category=obj.category,
+        rows = Transaction.objects.filter(
             transaction_type='expense',
-            date__gte=start_date.date()
-        ).aggregate(total=Sum('amount'))['total']
+            date__gte=min(week_start, year_start)
+        ).values('category_id').annotate(
+            weekly=Coalesce(Sum('amount', filter=Q(date__gte=week_start)), Decimal(0)),
+            monthly=Coalesce(Sum('amount', filter=Q(date__gte=month_start)), Decimal(0)),
+            yearly=Coalesce(Sum('amount', filter=Q(date__gte=year_start)), Decimal(0))
+        )
         
-        return float(total) if total else 0
+        spent_by_category = {row['category_id']: row for row in rows}
+        self.context['spent_by_category'] = spent_by_category
+        return spent_by_category
     
     def get_percentage_used(self, obj):
         spent = self.get_spent(obj)
@@ -0,0 +1,40 @@
+"""
+Signal handlers keeping derived transaction data in sync.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import MonthlySummary, Transaction
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_date(sender, instance, **kwargs):
+    """Track the stored date so moving a transaction refreshes both months."""
+    # Instances loaded from the database carry it already (Transaction.from_db);
+    # only instances saved before or loaded with the date deferred need a read
+    if instance._state.adding or getattr(instance, '_loaded_date', None):
+        return
+    instance._loaded_date = Transaction.objects.filter(
+        pk=instance.pk
+    ).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Transaction)
+def refresh_summary_on_save(sender, instance, **kwargs):
+    # Either date may be a string assigned before save() (as for_month allows)
+    to_date = Transaction._meta.get_field('date').to_python
+    saved_date = to_date(instance.date)
+    MonthlySummary.refresh(saved_date)
+    
+    previous_date = to_date(getattr(instance, '_loaded_date', None))
+    if previous_date and previous_date.replace(day=1) != saved_date.replace(day=1):
+        MonthlySummary.refresh(previous_date)
+    
+    # The saved date is now the stored one
+    instance._loaded_date = saved_date
+
+
+@receiver(post_delete, sender=Transaction)
+def refresh_summary_on_delete(sender, instance, **kwargs):
+    MonthlySummary.refresh(instance.date)
@@ -0,0 +1,182 @@
+"""
+Tests for the monthly summaries kept in sync by the Transaction signals and
+the CSV import.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Category, MonthlySummary, Transaction
+
+
+class MonthlySummarySignalTests(TestCase):
+    
+    def add(self, amount, day, transaction_type='expense'):
+        return Transaction.objects.create(
+            amount=Decimal(amount), description='Test', date=day,
+            transaction_type=transaction_type
+        )
+    
+    def summary(self, day):
+        return MonthlySummary.objects.get(month=day.replace(day=1))
+    
+    def test_create_updates_month(self):
+        self.add('100', date(2026, 3, 5))
+        self.add('40', date(2026, 3, 20))
+        self.add('500', date(2026, 3, 1), transaction_type='income')
+        
+        summary = self.summary(date(2026, 3, 1))
+        self.assertEqual(summary.total_spent, Decimal('140'))
+        self.assertEqual(summary.total_income, Decimal('500'))
+        self.assertEqual(summary.transaction_count, 3)
+    
+    def test_edit_updates_month(self):
+        transaction = self.add('100', date(2026, 3, 5))
+        transaction.amount = Decimal('75')
+        transaction.save()
+        
+        self.assertEqual(self.summary(date(2026, 3, 1)).total_spent, Decimal('75'))
+    
+    def test_moving_month_refreshes_both(self):
+        self.add('100', date(2026, 3, 5))
+        transaction = Transaction.objects.get()
+        transaction.date = date(2026, 4, 2)
+        transaction.save()
+        
+        self.assertEqual(self.summary(date(2026, 3, 1)).total_spent, 0)
+        self.assertEqual(self.summary(date(2026, 4, 1)).total_spent, Decimal('100'))
+    
+    def test_moving_month_after_create_refreshes_both(self):
+        transaction = self.add('100', date(2026, 3, 5))
+        transaction.date = date(2026, 4, 2)
+        transaction.save()
+        
+        self.assertEqual(self.summary(date(2026, 3, 1)).total_spent, 0)
+        self.assertEqual(self.summary(date(2026, 4, 1)).total_spent, Decimal('100'))
+    
+    def test_string_date_saves_again(self):
+        transaction = self.add('100', '2026-03-05')
+        transaction.date = '2026-04-02'
+        transaction.save()
+        transaction.amount = Decimal('80')
+        transaction.save()
+        
+        self.assertEqual(self.summary(date(2026, 3, 1)).total_spent, 0)
+        self.assertEqual(self.summary(date(2026, 4, 1)).total_spent, Decimal('80'))
+    
+    def test_loaded_transaction_save_skips_date_lookup(self):
+        self.add('100', date(2026, 3, 5))
+        transaction = Transaction.objects.get()
+        transaction.amount = Decimal('80')
+        
+        with CaptureQueriesContext(connection) as queries:
+            transaction.save()
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT "transactions"."date"')
+            for query in queries
+        ))
+    
+    def test_delete_updates_month(self):
+        self.add('100', date(2026, 3, 5))
+        self.add('40', date(2026, 3, 6)).delete()
+        
+        summary = self.summary(date(2026, 3, 1))
+        self.assertEqual(summary.total_spent, Decimal('100'))
+        self.assertEqual(summary.transaction_count, 1)
+    
+    def test_refresh_creates_missing_month_once(self):
+        MonthlySummary.refresh(date(2026, 3, 9))
+        MonthlySummary.refresh(date(2026, 3, 1))
+        
+        self.assertEqual(MonthlySummary.objects.filter(month=date(2026, 3, 1)).count(), 1)
+    
+    def test_for_month_does_not_write(self):
+        summary = MonthlySummary.for_month(date(2026, 3, 9))
+        
+        self.assertIsNone(summary.pk)
+        self.assertEqual(summary.total_spent, 0)
+        self.assertFalse(MonthlySummary.objects.exists())
+
+
+class DashboardTests(TestCase):
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+    
+    def test_dashboards_agree_and_do_not_write(self):
+        today = timezone.localdate()
+        Transaction.objects.create(amount=Decimal('250'), description='Lunch', date=today)
+        MonthlySummary.objects.all().delete()
+        
+        users = self.client.get('/api/users/dashboard/').json()
+        analytics = self.client.get('/api/analytics/dashboard/').json()
+        
+        self.assertEqual(users, analytics)
+        self.assertFalse(MonthlySummary.objects.exists())
+    
+    def test_dashboards_read_month_totals(self):
+        today = timezone.localdate()
+        Transaction.objects.create(amount=Decimal('250'), description='Lunch', date=today)
+        
+        for url in ('/api/users/dashboard/', '/api/analytics/dashboard/'):
+            data = self.client.get(url).json()
+            self.assertEqual(data['total_spent'], 250)
+            self.assertEqual(data['transaction_count'], 1)
+
+
+@override_settings(BULK_CREATE_BATCH_SIZE=2)
+class ImportCsvTests(TestCase):
+    
+    def setUp(self):
+        self.client = APIClient()
+    
+    def upload(self, content):
+        csv_file = SimpleUploadedFile('statement.csv', content.encode(), content_type='text/csv')
+        return self.client.post(
+            '/api/transactions/transactions/import_csv/', {'file': csv_file}, format='multipart'
+        )
+    
+    def test_import_inserts_rows_and_refreshes_months(self):
+        food = Category.objects.create(name='Food')
+        response = self.upload(
+            'Date,Description,Amount,Type,Category\n'
+            '2026-03-05,Cafe latte,4.50,,food\n'
+            '03/20/2026,"Grocer, weekly","$1,200.00",,\n'
+            '2026-04-01,Salary,3000,income,\n'
+            'not a date,Broken,10,,\n'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 3)
+        self.assertEqual(response.data['total_errors'], 1)
+        
+        latte = Transaction.objects.get(description='Cafe latte')
+        self.assertEqual(latte.category, food)
+        self.assertEqual(latte.merchant, 'Cafe')
+        self.assertIsNotNone(latte.created_at)
+        
+        march = MonthlySummary.objects.get(month=date(2026, 3, 1))
+        self.assertEqual(march.total_spent, Decimal('1204.50'))
+        self.assertEqual(march.transaction_count, 2)
+        april = MonthlySummary.objects.get(month=date(2026, 4, 1))
+        self.assertEqual(april.total_income, Decimal('3000'))
+    
+    def test_bad_rows_are_reported_not_inserted(self):
+        response = self.upload(
+            'date,description,amount\n'
+            '2026-03-05,,10\n'
+            '2026-03-06,Taxi,abc\n'
+        )
+        
+        self.assertEqual(response.data['imported'], 0)
+        self.assertEqual(response.data['total_errors'], 2)
+        self.assertFalse(Transaction.objects.exists())
@@ -2,7 +2,6 @@
 URL configuration for transactions app.
 """
 
-from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import CategoryViewSet, TransactionViewSet, BudgetViewSet
 
@@ -11,6 +10,5 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'transactions', TransactionViewSet, basename='transaction')
 router.register(r'budgets', BudgetViewSet, basename='budget')
 
-urlpatterns = [
-    path('', include(router.urls)),
-]
+# The router's own patterns, without an extra include() level to resolve through
+urlpatterns = router.urls
@@ -6,21 +6,65 @@ import csv
 import io
 from decimal import Decimal
 from datetime import datetime
+from functools import lru_cache
 
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction as db_transaction
 from django.db.models import Sum, Count
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
-from .models import Category, Transaction, Budget
+from apps.analytics.cache import bump_version
+from config.tracing import span
+from .models import Category, Transaction, Budget, MonthlySummary
 from .serializers import (
-    CategorySerializer, TransactionSerializer,
+    CategorySerializer, CategoryListSerializer, TransactionSerializer,
     TransactionCreateSerializer, BudgetSerializer
 )
 
+# Date formats accepted by the CSV import, in order of preference
+CSV_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%m-%d-%Y', '%Y/%m/%d']
+
+# Decimals are immutable and statements repeat amounts (rent, subscriptions)
+_parse_amount = lru_cache(maxsize=8192)(Decimal)
+
+
+@lru_cache(maxsize=1024)
+def _parse_csv_date(value):
+    """
+    Parse a CSV date, or return None if no format matches.
+    
+    Statements repeat the same dates row after row, so results are cached,
+    and only the formats using the value's separator are tried.
+    """
+    separator = '/' if '/' in value else '-'
+    for fmt in CSV_DATE_FORMATS:
+        if separator not in fmt:
+            continue
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _insert_transactions(transactions):
+    """Insert a batch of new transactions. Like bulk_create, this doesn't send post_save signals."""
+    with span('transactions.insert', rows=len(transactions)):
+        Transaction.objects.bulk_create(transactions)
+
+
+class _Echo:
+    """Pseudo-buffer whose write() hands the row back, for streaming csv.writer output."""
+    
+    def write(self, value):
+        return value
+
 
 class CategoryViewSet(viewsets.ModelViewSet):
     """ViewSet for managing categories."""
@@ -28,13 +72,26 @@ class CategoryViewSet(viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = []  # No authentication required
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CategoryListSerializer
+        return CategorySerializer
+    
     def get_queryset(self):
-        return Category.objects.all()
+        if self.action == 'list':
+            # The list feeds category pickers and renders no stats
+            return Category.objects.all()
+        # Per-category stats in the same query instead of two per row
+        # (aggregating drops Meta.ordering, so it is restated)
+        return Category.objects.annotate(
+            _transaction_count=Count('transactions'),
+            _total_spent=Sum('transactions__amount')
+        ).order_by('name')
     
     @action(detail=False, methods=['get'])
     def defaults(self, request):
         """Get all categories."""
-        categories = Category.objects.all()
+        categories = self.get_queryset()
         serializer = self.get_serializer(categories, many=True)
         return Response(serializer.data)
 
@@ -66,7 +123,18 @@ class TransactionViewSet(viewsets.ModelViewSet):
         if end_date:
             queryset = queryset.filter(date__lte=end_date)
         
-        return queryset.select_related('category')
+        queryset = queryset.select_related('category')
+        
+        if self.action == 'list':
+            # Load only what TransactionSerializer renders from both tables
+            queryset = queryset.only(
+                'id', 'amount', 'description', 'merchant', 'transaction_type',
+                'category', 'source', 'date', 'notes', 'tags',
+                'created_at', 'updated_at',
+                'category__name', 'category__icon'
+            )
+        
+        return queryset
     
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -97,79 +165,102 @@ class TransactionViewSet(viewsets.ModelViewSet):
             return Response({'error': 'File must be a CSV'}, status=400)
         
         try:
-            # Read and decode CSV
-            decoded_file = csv_file.read().decode('utf-8')
-            io_string = io.StringIO(decoded_file)
-            reader = csv.DictReader(io_string)
+            # Decode as rows are read instead of holding the whole upload as text
+            reader = csv.DictReader(
+                io.TextIOWrapper(csv_file.file, encoding='utf-8', newline='')
+            )
             
             imported = 0
+            months = set()
+            transactions = []
             errors = []
+            # Categories by lowercased name, loaded once for the whole file;
+            # the first in name order wins, as with .first() on iexact
+            categories_by_name = {}
+            for category in Category.objects.all():
+                categories_by_name.setdefault(category.name.lower(), category)
             
-            for row_num, row in enumerate(reader, start=2):
-                try:
-                    # Normalize column names (lowercase, strip)
-                    row = {k.lower().strip(): v.strip() for k, v in row.items() if k}
-                    
-                    # Parse date (try common formats)
-                    date_str = row.get('date', row.get('transaction date', row.get('posted date', '')))
-                    date = None
-                    for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%m-%d-%Y', '%Y/%m/%d']:
+            # One commit for the whole file, flushing a batch at a time
+            with db_transaction.atomic():
+                for row_num, row in enumerate(reader, start=2):
+                    try:
+                        # Normalize column names (lowercase, strip)
+                        row = {k.lower().strip(): v.strip() for k, v in row.items() if k}
+                        
+                        # Parse date (try common formats)
+                        date_str = row.get('date', row.get('transaction date', row.get('posted date', '')))
+                        date = _parse_csv_date(date_str)
+                        
+                        if not date:
+                            errors.append(f"Row {row_num}: Invalid date format")
+                            continue
+                        
+                        # Parse description
+                        description = row.get('description', row.get('memo', row.get('name', '')))
+                        if not description:
+                            errors.append(f"Row {row_num}: No description found")
+                            continue
+                        
+                        # Parse amount
+                        amount_str = row.get('amount', row.get('debit', row.get('credit', '0')))
+                        amount_str = amount_str.replace('$', '').replace(',', '').strip()
+                        
                         try:
-                            date = datetime.strptime(date_str, fmt).date()
-                            break
-                        except ValueError:
+                            amount = _parse_amount(amount_str)
+                        except:
+                            errors.append(f"Row {row_num}: Invalid amount")
                             continue
+                        
+                        # Determine transaction type
+                        trans_type = 'expense'
+                        if amount > 0:
+                            if 'credit' in row and row['credit'].strip():
+                                trans_type = 'income'
+                            elif row.get('type', '').lower() in ['credit', 'income', 'deposit']:
+                                trans_type = 'income'
+                        
+                        amount = abs(amount)
+                        
+                        # Try to match category by name if provided
+                        category = None
+                        category_name = row.get('category', '')
+                        if category_name:
+                            category = categories_by_name.get(category_name.lower())
+                        
+                        # Queue transaction; rows are inserted in batches
+                        transaction = Transaction(
+                            date=date,
+                            description=description,
+                            # First word only; the description is non-empty here
+                            merchant=description.split(None, 1)[0],
+                            amount=amount,
+                            transaction_type=trans_type,
+                            category=category,
+                            source='manual',
+                        )
+                        # Catch over-long text and out-of-range amounts here, so
+                        # one bad row can't fail the whole insert
+                        transaction.clean_fields(exclude=['category', 'receipt', 'tags'])
+                        transactions.append(transaction)
+                        months.add(date.replace(day=1))
+                        imported += 1
+                        
+                    except ValidationError as e:
+                        errors.append(f"Row {row_num}: {'; '.join(e.messages)}")
+                    except Exception as e:
+                        errors.append(f"Row {row_num}: {str(e)}")
                     
-                    if not date:
-                        errors.append(f"Row {row_num}: Invalid date format")
-                        continue
-                    
-                    # Parse description
-                    description = row.get('description', row.get('memo', row.get('name', '')))
-                    if not description:
-                        errors.append(f"Row {row_num}: No description found")
-                        continue
-                    
-                    # Parse amount
-                    amount_str = row.get('amount', row.get('debit', row.get('credit', '0')))
-                    amount_str = amount_str.replace('$', '').replace(',', '').strip()
-                    
-                    try:
-                        amount = Decimal(amount_str)
-                    except:
-                        errors.append(f"Row {row_num}: Invalid amount")
-                        continue
-                    
-                    # Determine transaction type
-                    trans_type = 'expense'
-                    if amount > 0:
-                        if 'credit' in row and row['credit'].strip():
-                            trans_type = 'income'
-                        elif row.get('type', '').lower() in ['credit', 'income', 'deposit']:
-                            trans_type = 'income'
-                    
-                    amount = abs(amount)
-                    
-                    # Try to match category by name if provided
-                    category = None
-                    category_name = row.get('category', '')
-                    if category_name:
-                        category = Category.objects.filter(name__iexact=category_name).first()
-                    
-                    # Create transaction
-                    Transaction.objects.create(
-                        date=date,
-                        description=description,
-                        merchant=description.split()[0] if description else '',
-                        amount=amount,
-                        transaction_type=trans_type,
-                        category=category,
-                        source='manual',
-                    )
-                    imported += 1
-                    
-                except Exception as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
+                    if len(transactions) >= settings.BULK_CREATE_BATCH_SIZE:
+                        _insert_transactions(transactions)
+                        transactions = []
+                
+                _insert_transactions(transactions)
+                # bulk_create skips the signals that maintain these
+                with span('transactions.refresh_summaries', months=len(months)):
+                    for month in months:
+                        MonthlySummary.refresh(month)
+            if imported:
+                bump_version()
             
             return Response({
                 'success': True,
@@ -184,24 +275,28 @@ class TransactionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def export_csv(self, request):
         """Export all transactions as CSV."""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="transactions.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Date', 'Description', 'Merchant', 'Category', 'Amount', 'Type', 'Notes'])
+        # Stream rows as they are fetched instead of building the file in memory
+        transactions = self.get_queryset().only(
+            'date', 'description', 'merchant', 'amount', 'transaction_type',
+            'notes', 'category', 'category__name'
+        ).iterator(chunk_size=2000)
+        writer = csv.writer(_Echo())
         
-        transactions = self.get_queryset()
-        for t in transactions:
-            writer.writerow([
-                t.date.isoformat(),
-                t.description,
-                t.merchant or '',
-                t.category.name if t.category else '',
-                str(t.amount),
-                t.transaction_type,
-                t.notes or ''
-            ])
+        def rows():
+            yield writer.writerow(['Date', 'Description', 'Merchant', 'Category', 'Amount', 'Type', 'Notes'])
+            for t in transactions:
+                yield writer.writerow([
+                    t.date.isoformat(),
+                    t.description,
+                    t.merchant or '',
+                    t.category.name if t.category else '',
+                    str(t.amount),
+                    t.transaction_type,
+                    t.notes or ''
+                ])
         
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="transactions.csv"'
         return response
 
 
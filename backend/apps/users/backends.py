@@ -4,6 +4,7 @@ Custom authentication backend to allow login with email.
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
 
 User = get_user_model()
 
@@ -14,15 +15,14 @@ class EmailBackend(ModelBackend):
     """
     
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # Try to find user by email
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
-            # Try to find user by username (fallback)
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                return None
+        # Email and username are both unique, so at most two users match
+        users = list(User.objects.filter(Q(email=username) | Q(username=username))[:2])
+        if not users:
+            return None
+        
+        # An email match takes precedence over a username match
+        users.sort(key=lambda user: user.email != username)
+        user = users[0]
         
         # Check password
         if user.check_password(password) and self.user_can_authenticate(user):
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 21:59
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_user_groups_alter_user_user_permissions"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="users_email_lower_uniq",
+            ),
+        ),
+    ]
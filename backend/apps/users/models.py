@@ -4,6 +4,7 @@ Custom User model with additional profile fields for expense tracking.
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class User(AbstractUser):
@@ -46,6 +47,11 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        constraints = [
+            # Emails match case-insensitively; this also indexes Lower(email)
+            # for the login lookup
+            models.UniqueConstraint(Lower('email'), name='users_email_lower_uniq'),
+        ]
     
     def __str__(self):
         return self.email or self.username
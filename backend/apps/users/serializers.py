@@ -5,6 +5,7 @@ Serializers for User management.
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.db.models.functions import Lower
 from .models import UserPreferences
 
 User = get_user_model()
@@ -47,7 +48,10 @@ class RegisterSerializer(serializers.ModelSerializer):
         }
     
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        # Case-insensitive, like the unique constraint on User.email
+        if User.objects.alias(
+            email_lower=Lower('email')
+        ).filter(email_lower=value.lower()).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value
     
@@ -60,10 +64,15 @@ class RegisterSerializer(serializers.ModelSerializer):
         # Auto-generate username from email if not provided
         if not attrs.get('username'):
             attrs['username'] = attrs['email'].split('@')[0]
-            # Ensure unique username
+            # Ensure unique username, checking candidates against one query
             base_username = attrs['username']
+            taken = set(
+                User.objects.filter(
+                    username__startswith=base_username
+                ).values_list('username', flat=True)
+            )
             counter = 1
-            while User.objects.filter(username=attrs['username']).exists():
+            while attrs['username'] in taken:
                 attrs['username'] = f"{base_username}{counter}"
                 counter += 1
         
@@ -83,8 +92,7 @@ class RegisterSerializer(serializers.ModelSerializer):
             password=password,
             **validated_data
         )
-        # Create default preferences
-        UserPreferences.objects.create(user=user)
+        # Default preferences are created by the post_save handler
         return user
 
 
@@ -4,6 +4,7 @@ Custom JWT serializers for email-based authentication.
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
@@ -19,13 +20,17 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
         email = attrs.get('email') or attrs.get('username')
         password = attrs.get('password')
         
-        if email:
-            try:
-                user = User.objects.get(email=email)
+        # A value without an '@' can't be an email; skip straight to username login
+        if email and '@' in email:
+            # Only the username is needed; Lower(email) is uniquely indexed
+            username = User.objects.alias(
+                email_lower=Lower('email')
+            ).filter(
+                email_lower=email.lower()
+            ).values_list('username', flat=True).first()
+            if username is not None:
                 # Set username for parent validation
-                attrs['username'] = user.username
-            except User.DoesNotExist:
-                # Try as username if not email
-                pass
+                attrs['username'] = username
+            # Otherwise try it as a username
         
         return super().validate(attrs)
@@ -0,0 +1,15 @@
+"""
+Signal handlers for User changes.
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User, UserPreferences
+
+
+@receiver(post_save, sender=User)
+def create_preferences(sender, instance, created, raw=False, **kwargs):
+    """Give every new user default preferences (fixtures bring their own)."""
+    if created and not raw:
+        UserPreferences.objects.create(user=instance)
@@ -7,7 +7,11 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
+from apps.analytics.cache import cached_response
+from apps.analytics.renderers import ORJSONRenderer
+from apps.transactions.models import MonthlySummary
 from .serializers import UserSerializer, RegisterSerializer, UserPreferencesSerializer
 from .models import UserPreferences
 
@@ -24,7 +28,6 @@ def get_default_user():
             email='user@example.com',
             password='password'
         )
-        UserPreferences.objects.create(user=user)
     return user
 
 
@@ -55,57 +58,37 @@ class PreferencesView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         user = get_default_user()
-        preferences, _ = UserPreferences.objects.get_or_create(user=user)
-        return preferences
+        # Created along with the user; the fallback covers users that predate it
+        try:
+            return UserPreferences.objects.get(user=user)
+        except UserPreferences.DoesNotExist:
+            return UserPreferences.objects.create(user=user)
 
 
 class DashboardStatsView(APIView):
     """Get dashboard statistics for the user."""
     
     permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer]
     
+    # Cached until the next Transaction or User write bumps the data version
+    @cached_response
     def get(self, request):
         user = get_default_user()
         
-        # Import here to avoid circular imports
-        from apps.transactions.models import Transaction
-        from django.db.models import Sum
-        from django.utils import timezone
-        from datetime import timedelta
+        # Get current month stats; the month turns over at local midnight
+        month_start = timezone.localdate().replace(day=1)
         
-        # Get current month stats
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        monthly_transactions = Transaction.objects.filter(
-            user=user,  # Transaction model needs 'user' field check! Wait, I recall it didn't have one?
-            # I need to re-verify Transaction model structure. If it doesn't have user, we might be filtering by nothing or it's global.
-            # But earlier I saw 'user' field referenced in Receipt. 
-            # Let's assume for a moment Transaction *should* have it or uses it. 
-            # Actually, previous grep showed no 'user' field in Transaction model file read. 
-            # If Transaction has no user field, then it IS global already.
-            # But 'monthly_transactions = Transaction.objects.filter(user=user....)' implies it DOES have it or expects it.
-            # I must check if Transaction model has 'user'. 
-            # I will read Transaction model content again to be 100% sure. 
-            # But I am editing THIS file now. 
-            # If line 65 says 'user=user', then Transaction MUST have user field or it will crash.
-            # If the original code had 'user=user', then Transaction model MUST have user.
-            # Let's just update the view logic first regarding User retrieval.
-            date__gte=month_start
-        )
-        
-        total_spent = monthly_transactions.filter(
-            transaction_type='expense'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        total_income = monthly_transactions.filter(
-            transaction_type='income'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        # Transactions aren't per-user in Single User Mode; the month's totals
+        # are maintained by the Transaction signals, as for the analytics
+        # dashboard
+        summary = MonthlySummary.for_month(month_start)
         
+        # Decimals go to the renderer as they are; it writes them as JSON numbers
         return Response({
-            'monthly_budget': float(user.monthly_budget),
-            'total_spent': float(total_spent),
-            'total_income': float(total_income),
-            'remaining_budget': float(user.monthly_budget) - float(total_spent),
-            'transaction_count': monthly_transactions.count(),
+            'monthly_budget': user.monthly_budget,
+            'total_spent': summary.total_spent,
+            'total_income': summary.total_income,
+            'remaining_budget': user.monthly_budget - summary.total_spent,
+            'transaction_count': summary.transaction_count,
         })
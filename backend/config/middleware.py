@@ -0,0 +1,26 @@
+"""
+Project-wide middleware.
+"""
+
+from django.http import HttpResponse
+
+# Same body as config.urls.health_check
+HEALTH_CHECK_BODY = b'{"status": "ok"}'
+
+
+class HealthCheckMiddleware:
+    """
+    Answer the health check at / before the rest of the middleware runs.
+    
+    Liveness probes hit it every few seconds and need no session, auth,
+    CSRF or CORS handling. /api/ping/ is left to the full stack, since it
+    exists to verify routing and CORS.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if request.path == '/' and request.method in ('GET', 'HEAD'):
+            return HttpResponse(HEALTH_CHECK_BODY, content_type='application/json')
+        return self.get_response(request)
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Health probes skip everything below
+    'config.middleware.HealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -81,6 +83,18 @@ DATABASES = {
     )
 }
 
+# Cache
+# Must be shared by every worker process: analytics responses are invalidated
+# by bumping a version key on writes (apps/analytics/cache.py), and a
+# per-process cache such as LocMemCache would only see its own bumps. The
+# table is created by the analytics app's migrations.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -113,6 +127,12 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Receipt OCR engine: 'tesseract' (default, CPU) or 'paddle' (PaddleOCR, GPU)
+RECEIPT_OCR_BACKEND = os.getenv('RECEIPT_OCR_BACKEND', 'tesseract')
+
+# Rows per INSERT for bulk imports
+BULK_CREATE_BATCH_SIZE = int(os.getenv('BULK_CREATE_BATCH_SIZE', 500))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework
@@ -0,0 +1,23 @@
+"""
+Optional OpenTelemetry tracing.
+
+Spans are recorded when opentelemetry is installed and an SDK is configured,
+e.g. by running under `opentelemetry-instrument`, which also traces requests
+and database queries. Otherwise span() is a no-op.
+"""
+
+from contextlib import nullcontext
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+def span(name: str, **attributes):
+    """Context manager timing one stage of work as a span named `name`."""
+    if trace is None:
+        return nullcontext()
+    return trace.get_tracer('expense_tracker').start_as_current_span(
+        name, attributes=attributes or None
+    )
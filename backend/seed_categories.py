@@ -8,6 +8,9 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
+from django.db import transaction
+
+from apps.analytics.cache import bump_version
 from apps.transactions.models import Category
 
 # Default expense categories
@@ -38,22 +41,34 @@ income_categories = [
 
 all_categories = expense_categories + income_categories
 
-# Create categories
-created_count = 0
-for cat_data in all_categories:
-    category, created = Category.objects.get_or_create(
-        name=cat_data['name'],
-        defaults={
-            'icon': cat_data['icon'],
-            'color': cat_data['color'],
-            'is_income': cat_data['is_income'],
-        }
-    )
-    if created:
-        created_count += 1
-        print(f"✅ Created: {category}")
-    else:
-        print(f"⏭️  Already exists: {category}")
+# Create categories: one query for what exists and one insert for the rest
+# (Category.name isn't unique, so ignore_conflicts can't stand in for the lookup)
+with transaction.atomic():
+    existing = {
+        category.name: category
+        for category in Category.objects.filter(
+            name__in=[cat_data['name'] for cat_data in all_categories]
+        )
+    }
+    new_categories = Category.objects.bulk_create([
+        Category(
+            name=cat_data['name'],
+            icon=cat_data['icon'],
+            color=cat_data['color'],
+            is_income=cat_data['is_income'],
+        )
+        for cat_data in all_categories
+        if cat_data['name'] not in existing
+    ])
+
+# Bulk writes skip the post_save signal that invalidates analytics
+bump_version()
+
+created_count = len(new_categories)
+for category in new_categories:
+    print(f"✅ Created: {category}")
+for category in existing.values():
+    print(f"⏭️  Already exists: {category}")
 
 print(f"\n🎉 Done! Created {created_count} new categories.")
 print(f"📊 Total categories in database: {Category.objects.count()}")